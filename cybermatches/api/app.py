@@ -118,12 +118,30 @@ def _get_timezone_msk() -> timezone:
     """Кэширование часового пояса МСК"""
     return timezone(timedelta(hours=3))
 
+def _to_msk(dt: datetime, tz_msk: timezone) -> datetime:
+    """Приводит время к МСК; если смещение уже +03:00 — возвращает как есть."""
+    if dt.tzinfo is None:
+        return dt.replace(tzinfo=timezone.utc).astimezone(tz_msk)
+    if dt.utcoffset() == tz_msk.utcoffset(None):
+        return dt
+    return dt.astimezone(tz_msk)
+
+def _hhmm(dt: datetime) -> str:
+    """Быстрый аналог strftime("%H:%M")."""
+    return f"{dt.hour:02d}:{dt.minute:02d}"
+
 @lru_cache(maxsize=32)
 def _format_date_cache(date_str: str) -> date:
     """Кэшированное преобразование строки даты в объект date"""
     return datetime.strptime(date_str, "%d-%m-%Y").date()
 
 
+# Регулярки для построчной обработки матчей — компилируем один раз
+_WS_RE = re.compile(r"\s+")
+_URL_MATCH_ID_RE = re.compile(r"Match:(ID_[^&#/?]+)")
+_URL_BARE_ID_RE = re.compile(r"(ID_[A-Za-z0-9]+(?:_[0-9]+)?)")
+
+
 def extract_liquipedia_id(match_uid: Optional[str], match_url: Optional[str]) -> Optional[str]:
     """
     Пытаемся вытащить Liquipedia Match:ID из:
@@ -137,10 +155,10 @@ def extract_liquipedia_id(match_uid: Optional[str], match_url: Optional[str]) ->
         return match_uid[3:]
 
     if match_url:
-        m1 = re.search(r"Match:(ID_[^&#/?]+)", match_url)
+        m1 = _URL_MATCH_ID_RE.search(match_url)
         if m1:
             return m1.group(1)
-        m2 = re.search(r"(ID_[A-Za-z0-9]+(?:_[0-9]+)?)", match_url)
+        m2 = _URL_BARE_ID_RE.search(match_url)
         if m2:
             return m2.group(1)
 
@@ -210,12 +228,12 @@ async def get_matches_for_date(target_date: date) -> List[Dict[str, Any]]:
     def _norm_team(value: Optional[str]) -> str:
         if not value:
             return ""
-        return re.sub(r"\s+", " ", value.strip().lower())
+        return _WS_RE.sub(" ", value.strip().lower())
 
     def _norm_tournament(value: Optional[str]) -> str:
         if not value:
             return ""
-        cleaned = re.sub(r"\s+", " ", value).strip()
+        cleaned = _WS_RE.sub(" ", value).strip()
         if " - " in cleaned:
             cleaned = cleaned.split(" - ", 1)[0]
         return cleaned.lower()
@@ -234,17 +252,14 @@ async def get_matches_for_date(target_date: date) -> List[Dict[str, Any]]:
             match_url,
         ) = row
 
-        if match_time_msk.tzinfo is None:
-            match_time_msk = match_time_msk.replace(tzinfo=timezone.utc).astimezone(tz_msk)
-        else:
-            match_time_msk = match_time_msk.astimezone(tz_msk)
+        match_time_msk = _to_msk(match_time_msk, tz_msk)
 
         liquipedia_id = liqui_in_db or extract_liquipedia_id(match_uid, match_url)
 
         match_dict: Dict[str, Any] = {
             "match_time_msk": match_time_msk.isoformat(),
             "_match_time_dt": match_time_msk,
-            "time_msk": match_time_msk.strftime("%H:%M"),
+            "time_msk": _hhmm(match_time_msk),
             "team1": team1,
             "team1_url": team_urls.get(team1) if team1 else None,
             "team2": team2,
@@ -350,8 +365,9 @@ async def get_team_urls_batch(team_names: List[str]) -> Dict[str, Optional[str]]
     if not team_names:
         return {}
 
-    unique_names = list(set(name for name in team_names if name))
-    if not unique_names:
+    # дедуп сразу по нижнему регистру — в запрос и в результат идут одни и те же ключи
+    unique_lower = {name.lower() for name in team_names if name}
+    if not unique_lower:
         return {}
 
     async with db_pool.get_connection() as cur:
@@ -361,11 +377,11 @@ async def get_team_urls_batch(team_names: List[str]) -> Dict[str, Optional[str]]
             FROM dota_teams
             WHERE LOWER(name) = ANY(%s);
             """,
-            ([name.lower() for name in unique_names],),
+            (list(unique_lower),),
         )
         rows = await cur.fetchall()
 
-    result = {name.lower(): None for name in unique_names}
+    result: Dict[str, Optional[str]] = dict.fromkeys(unique_lower)
     for row_name, row_url in rows:
         result[row_name.lower()] = row_url
 
@@ -382,8 +398,9 @@ async def get_cs2_team_urls_batch(team_names: List[str]) -> Dict[str, Optional[s
     if not team_names:
         return {}
 
-    unique_names = list(set(name for name in team_names if name))
-    if not unique_names:
+    # дедуп сразу по нижнему регистру — в запрос и в результат идут одни и те же ключи
+    unique_lower = {name.lower() for name in team_names if name}
+    if not unique_lower:
         return {}
 
     async with db_pool.get_connection() as cur:
@@ -393,11 +410,11 @@ async def get_cs2_team_urls_batch(team_names: List[str]) -> Dict[str, Optional[s
             FROM cs2_teams
             WHERE LOWER(name) = ANY(%s);
             """,
-            ([name.lower() for name in unique_names],),
+            (list(unique_lower),),
         )
         rows = await cur.fetchall()
 
-    result = {name.lower(): None for name in unique_names}
+    result: Dict[str, Optional[str]] = dict.fromkeys(unique_lower)
     for row_name, row_url in rows:
         if row_name:
             result[str(row_name).lower()] = row_url
@@ -497,10 +514,7 @@ async def get_cs2_matches_for_date(target_date: date) -> List[Dict[str, Any]]:
         if match_time_msk is None:
             continue
 
-        if match_time_msk.tzinfo is None:
-            when_msk = match_time_msk.replace(tzinfo=timezone.utc).astimezone(tz_msk)
-        else:
-            when_msk = match_time_msk.astimezone(tz_msk)
+        when_msk = _to_msk(match_time_msk, tz_msk)
 
         resolved_team1_url = team1_url or (team_urls_lookup.get(team1) if team1 else None)
         resolved_team2_url = team2_url or (team_urls_lookup.get(team2) if team2 else None)
@@ -510,7 +524,7 @@ async def get_cs2_matches_for_date(target_date: date) -> List[Dict[str, Any]]:
         matches.append(
             {
                 "match_time_msk": when_msk.isoformat(),
-                "time_msk": when_msk.strftime("%H:%M"),
+                "time_msk": _hhmm(when_msk),
                 "team1": team1,
                 "team1_url": resolved_team1_url,
                 "team2": team2,
@@ -15,6 +15,7 @@ from pathlib import Path
 
 import aiohttp
 import psycopg
+from psycopg_pool import ConnectionPool
 from aiogram import Bot, Dispatcher, F
 from aiogram.filters import Command
 from aiogram.types import Message, CallbackQuery, InlineKeyboardMarkup, InlineKeyboardButton
@@ -150,14 +151,32 @@ _cache_lock = asyncio.Lock()
 
 # -------------------- Работа с БД --------------------
 
+_db_pool: Optional[ConnectionPool] = None
+
+
 def get_db_conn():
-    return psycopg.connect(
-        host=DB_HOST,
-        port=DB_PORT,
-        dbname=DB_NAME,
-        user=DB_USER,
-        password=DB_PASSWORD,
-    )
+    """
+    Соединение из пула (открывается при первом обращении).
+    Использование прежнее: `with get_db_conn() as conn:` — commit/rollback
+    на выходе, только соединение возвращается в пул, а не закрывается.
+    """
+    global _db_pool
+    if _db_pool is None:
+        _db_pool = ConnectionPool(
+            psycopg.conninfo.make_conninfo(
+                host=DB_HOST,
+                port=DB_PORT,
+                dbname=DB_NAME,
+                user=DB_USER,
+                password=DB_PASSWORD,
+            ),
+            min_size=1,
+            max_size=4,
+            # бот подолгу простаивает — отвалившееся соединение пересоздаём до выдачи
+            check=ConnectionPool.check_connection,
+            open=True,
+        )
+    return _db_pool.connection()
 
 
 def init_db():
@@ -1661,6 +1680,9 @@ async def main():
                 except asyncio.CancelledError:
                     logger.info("%s cancelled", task_name)
 
+        if _db_pool is not None:
+            _db_pool.close()
+
         logger.info("Бот остановлен")
 
 
@@ -2,6 +2,7 @@ from __future__ import annotations
 
 import re
 from typing import Optional
+from urllib.parse import urlparse
 
 from bs4 import Tag
 
@@ -14,6 +15,10 @@ _BO_RE = re.compile(r"(?:\(|\b)bo\s*([0-9]+)", re.IGNORECASE)
 def strip_page_does_not_exist(name: str) -> str:
     if not name:
         return ""
+    name = name.strip()
+    # почти все имена без хвоста "(page does not exist)" — регулярку гоняем только по нужным
+    if not name.endswith(")"):
+        return name
     return _PAGE_MISSING_RE.sub("", name).strip()
 
 
@@ -67,3 +72,14 @@ def parse_score_tuple(score: Optional[str], max_points: int = 10) -> Optional[tu
     if left < 0 or right < 0 or left > max_points or right > max_points:
         return None
     return left, right
+
+
+def slug_from_liquipedia_url(full_url: str) -> str:
+    """
+    Последний сегмент пути Liquipedia-ссылки: https://liquipedia.net/dota2/Team_Liquid -> Team_Liquid.
+    """
+    path = urlparse(full_url).path
+    parts = [p for p in path.split("/") if p]
+    if len(parts) >= 2:
+        return parts[-1]
+    return path.lstrip("/")
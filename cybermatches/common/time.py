@@ -10,6 +10,7 @@ except ImportError:  # pragma: no cover
     from backports.zoneinfo import ZoneInfo
 
 from bs4 import Tag
+import soupsieve as sv
 
 
 MONTHS: dict[str, int] = {
@@ -51,22 +52,33 @@ DEFAULT_TZ_IANA_MAP = {
     "BRT": "America/Sao_Paulo",
 }
 
+_MONTHS_LOWER: dict[str, int] = {name.lower(): num for name, num in MONTHS.items()}
+
+_TAG_RE = re.compile(r"<.*?>")
 _TIME_RE = re.compile(
     r"([A-Za-z]+)\s+(\d{1,2}),\s+(\d{4})\s*-\s*(\d{1,2}):(\d{2})\s*([A-Z]{2,6})?"
 )
+_TIME_MSK_RE = re.compile(
+    r"([A-Za-z]+)\s+(\d{1,2}),\s+(\d{4})\s*-\s*(\d{1,2}):(\d{2})\s*([A-Z]{2,4})"
+)
+_LIQUIPEDIA_TIME_RE = re.compile(
+    r"^([A-Za-z]+)\s+(\d{1,2}),\s+(\d{4})\s*-\s*(\d{2}):(\d{2})([A-Z]+)$"
+)
+_OFFSET_RE = re.compile(r"^[\+\-]\d{1,2}:\d{2}$")
+
+_MSK_TZ = ZoneInfo("Europe/Moscow")
+_UTC_TZ = ZoneInfo("UTC")
+_SEL_TIMER_ABBR = sv.compile(".timer-object-date abbr[data-tz]")
 
 
 def parse_time_to_msk(time_str: str, tz_map: Optional[dict[str, str]] = None) -> Optional[datetime]:
     if not time_str:
         return None
 
-    cleaned = re.sub(r"<.*?>", "", time_str)
+    cleaned = _TAG_RE.sub("", time_str)
     cleaned = " ".join(cleaned.split())
 
-    m = re.search(
-        r"([A-Za-z]+)\s+(\d{1,2}),\s+(\d{4})\s*-\s*(\d{1,2}):(\d{2})\s*([A-Z]{2,4})",
-        cleaned,
-    )
+    m = _TIME_MSK_RE.search(cleaned)
     if not m:
         return None
 
@@ -87,7 +99,7 @@ def parse_time_to_msk(time_str: str, tz_map: Optional[dict[str, str]] = None) ->
     try:
         src_tz = ZoneInfo(tz_name)
         dt_src = dt_naive.replace(tzinfo=src_tz)
-        return dt_src.astimezone(ZoneInfo("Europe/Moscow"))
+        return dt_src.astimezone(_MSK_TZ)
     except Exception:
         return None
 
@@ -101,7 +113,7 @@ def parse_time_to_target_tz(
     if not time_str:
         return None
 
-    cleaned = re.sub(r"<.*?>", "", time_str)
+    cleaned = _TAG_RE.sub("", time_str)
     cleaned = " ".join(cleaned.split())
 
     m = _TIME_RE.search(cleaned)
@@ -120,11 +132,11 @@ def parse_time_to_target_tz(
 
     offset = None
     if container:
-        ab = container.select_one(".timer-object-date abbr[data-tz]")
+        ab = _SEL_TIMER_ABBR.select_one(container)
         if ab:
             offset = (ab.get("data-tz") or "").strip() or None
 
-    if offset and re.match(r"^[\+\-]\d{1,2}:\d{2}$", offset):
+    if offset and _OFFSET_RE.match(offset):
         sign = 1 if offset.startswith("+") else -1
         hh, mm = offset[1:].split(":")
         delta = timedelta(hours=int(hh) * sign, minutes=int(mm) * sign)
@@ -150,22 +162,26 @@ def parse_liquipedia_time(
     if not raw:
         return None, None
 
-    m = re.match(r"^(.*?\d{4})\s*-\s*(\d{2}:\d{2})([A-Z]+)$", raw)
+    m = _LIQUIPEDIA_TIME_RE.match(raw)
     if not m:
         return None, None
 
-    date_part, time_part, tz_abbr = m.groups()
-    tz_abbr = tz_abbr.strip()
+    month_name, day, year, hour, minute, tz_abbr = m.groups()
 
     tz_name = (tz_map or DEFAULT_TZ_IANA_MAP).get(tz_abbr)
     if not tz_name:
         return None, None
 
+    month = _MONTHS_LOWER.get(month_name.lower())
+    if not month:
+        return None, None
+
     try:
-        naive = datetime.strptime(f"{date_part} {time_part}", "%B %d, %Y %H:%M")
+        dt_local = datetime(
+            int(year), month, int(day), int(hour), int(minute), tzinfo=ZoneInfo(tz_name)
+        )
     except ValueError:
         return None, None
 
-    dt_local = naive.replace(tzinfo=ZoneInfo(tz_name))
-    dt_utc = dt_local.astimezone(ZoneInfo("UTC"))
+    dt_utc = dt_local.astimezone(_UTC_TZ)
     return dt_utc, dt_local.astimezone(target_tz)
@@ -30,16 +30,21 @@ from logging.handlers import RotatingFileHandler
 import os
 import re
 import time
+from contextlib import contextmanager
 from dataclasses import dataclass
 from datetime import datetime, timedelta, timezone
 from pathlib import Path
-from typing import Optional, Dict, List, Tuple, Set, Iterable
+from typing import Optional, Dict, List, Tuple, Set, Iterable, Iterator
 from urllib.parse import urljoin, urlparse, parse_qs, unquote
 
 import psycopg
 from psycopg import errors
+from psycopg.conninfo import make_conninfo
+from psycopg_pool import ConnectionPool
 import requests
+from requests.adapters import HTTPAdapter
 from bs4 import BeautifulSoup, Tag
+import soupsieve as sv
 from dotenv import load_dotenv
 
 from cybermatches.common.metrics import (
@@ -78,7 +83,7 @@ logger = logging.getLogger("cs2_parser")
 
 
 def log_event(event: dict) -> None:
-    event["time"] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    event["time"] = time.strftime("%Y-%m-%d %H:%M:%S")
     logger.info(json.dumps(event, ensure_ascii=False))
 
 
@@ -112,6 +117,12 @@ HEADERS = {
     "Accept-Language": "en-US,en;q=0.9,ru;q=0.8",
 }
 
+# Одна сессия на процесс: keep-alive к liquipedia.net вместо нового TCP/TLS на каждый запрос.
+HTTP_SESSION = requests.Session()
+HTTP_SESSION.headers.update(HEADERS)
+HTTP_SESSION.headers.update({"Accept-Encoding": "gzip, deflate", "Connection": "keep-alive"})
+HTTP_SESSION.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=8))
+
 TZ_IANA_MAP = {
     "UTC": "UTC",
     "GMT": "UTC",
@@ -172,16 +183,54 @@ class Tournament:
 
 
 KNOWN_TOURNAMENTS_BY_NAME: Dict[str, Tournament] = {}
+# Main_Page между запусками: юниты systemd гоняют парсер по одному проходу,
+# поэтому ETag / Last-Modified и тело страницы держим на диске (как кэш портала команд)
+PARSER_CACHE_DIR = Path(os.getenv("PARSER_CACHE_DIR", LOG_DIR))
+MAIN_PAGE_CACHE_BODY = PARSER_CACHE_DIR / "cs2_main_page.html"
+MAIN_PAGE_CACHE_META = PARSER_CACHE_DIR / "cs2_main_page.meta"
 
 
 # ---------------------------------------------------------------------------
 # DB HELPERS
 # ---------------------------------------------------------------------------
 
-def get_db_connection() -> psycopg.Connection:
-    return psycopg.connect(
-        host=DB_HOST, port=DB_PORT, dbname=DB_NAME, user=DB_USER, password=DB_PASSWORD
-    )
+_DB_POOL: Optional[ConnectionPool] = None
+
+
+def _get_db_pool() -> ConnectionPool:
+    global _DB_POOL
+    if _DB_POOL is None:
+        # synchronous_commit=off только для сессии парсера: COMMIT не ждёт fsync WAL.
+        # Потерять последние секунды скрейпа при падении БД не страшно — следующий
+        # проход всё перекачает.
+        _DB_POOL = ConnectionPool(
+            make_conninfo(
+                host=DB_HOST,
+                port=DB_PORT,
+                dbname=DB_NAME,
+                user=DB_USER,
+                password=DB_PASSWORD,
+                options="-c synchronous_commit=off",
+            ),
+            min_size=1,
+            max_size=1,
+            # соединение, отвалившееся в простое между проходами (рестарт БД,
+            # idle-таймаут), проверяется перед выдачей и молча пересоздаётся
+            check=ConnectionPool.check_connection,
+            open=True,
+        )
+    return _DB_POOL
+
+
+@contextmanager
+def get_db_connection() -> Iterator[psycopg.Connection]:
+    """
+    Соединение из пула на одно соединение вместо connect/close в каждой функции прохода.
+    Семантика `with` как у psycopg: commit при успехе, rollback при исключении —
+    только соединение возвращается в пул, а не закрывается.
+    """
+    with _get_db_pool().connection() as conn:
+        yield conn
 
 
 def _get_match_counts() -> tuple[int, int]:
@@ -191,17 +240,17 @@ def _get_match_counts() -> tuple[int, int]:
 
     with get_db_connection() as conn:
         with conn.cursor() as cur:
-            cur.execute(f"SELECT COUNT(*) FROM public.{MATCHES_TABLE};")
-            (total,) = cur.fetchone()
+            # оба счётчика за один проход по таблице
             cur.execute(
                 f"""
-                SELECT COUNT(*)
-                FROM public.{MATCHES_TABLE}
-                WHERE match_time_msk >= %s AND match_time_msk < %s;
+                SELECT
+                    COUNT(*),
+                    COUNT(*) FILTER (WHERE match_time_msk >= %s AND match_time_msk < %s)
+                FROM public.{MATCHES_TABLE};
                 """,
                 (start_dt, end_dt),
             )
-            (today,) = cur.fetchone()
+            total, today = cur.fetchone()
 
     return int(total), int(today)
 
@@ -223,7 +272,6 @@ def ensure_cs2_teams_table(conn: psycopg.Connection) -> None:
             );
         """)
         cur.execute(f"CREATE INDEX IF NOT EXISTS {TEAMS_TABLE}_name_idx ON public.{TEAMS_TABLE}(lower(name));")
-    conn.commit()
 
 
 def ensure_cs2_matches_table(conn: psycopg.Connection) -> None:
@@ -290,17 +338,56 @@ def ensure_cs2_matches_table(conn: psycopg.Connection) -> None:
                 END IF;
             END $$;
         """)
+
+
+_SCHEMA_READY = False
+
+
+def init_schema(conn: psycopg.Connection) -> None:
+    """
+    DDL таблиц cs2 — один раз на процесс. CREATE ... IF NOT EXISTS даже как no-op
+    берёт блокировку каталога и стоит лишний round-trip, поэтому в каждом проходе
+    его не гоняем.
+    """
+    global _SCHEMA_READY
+    if _SCHEMA_READY:
+        return
+    # обе таблицы — в одной транзакции: один commit вместо двух
+    ensure_cs2_teams_table(conn)
+    ensure_cs2_matches_table(conn)
     conn.commit()
+    _SCHEMA_READY = True
 
 
 # ---------------------------------------------------------------------------
 # NETWORK / PARSING UTILS
 # ---------------------------------------------------------------------------
 
-def fetch_html(url: str) -> str:
-    resp = requests.get(url, headers=HEADERS, timeout=25)
+def fetch_html(url: str) -> bytes:
+    resp = HTTP_SESSION.get(url, timeout=25)
     resp.raise_for_status()
-    return resp.text
+    # Сырые байты: BeautifulSoup/lxml сами определят кодировку по <meta charset>.
+    return resp.content
+
+
+_WS_RE = re.compile(r"\s+")
+_UNDERSCORES_RE = re.compile(r"_+")
+_TRAILING_SLASHES_RE = re.compile(r"/+$")
+_BO_TEXT_RE = re.compile(r"bo\s*([0-9]+)", re.IGNORECASE)
+_LP_UID_RE = re.compile(r"^lp:(ID_[^|]+)$")
+_MATCH_URL_ID_RE = re.compile(r"Match:(ID_[^&#/?]+)")
+# CSS-селекторы компилируем один раз, а не на каждый select() по контейнеру
+_SEL_MATCH_INFO = sv.compile(".match-info")
+_SEL_TIMER = sv.compile(".timer-object-date, .timer-object")
+_SEL_TIMER_OBJECT = sv.compile(".timer-object")
+_SEL_TIMER_DATE = sv.compile(".timer-object-date")
+_SEL_TEAM_LINKS = sv.compile(".match-info-header-opponent .name a")
+_SEL_SCOREHOLDER = sv.compile(".match-info-header-scoreholder")
+_SEL_SCORE_UPPER = sv.compile(".match-info-header-scoreholder-upper")
+_SEL_SCORE_LOWER = sv.compile(".match-info-header-scoreholder-lower")
+_SEL_SCORE_CELLS = sv.compile(".match-info-header-scoreholder-score")
+_SEL_TOURNAMENT_NAME = sv.compile(".match-info-tournament-name span")
+_SEL_TOURNAMENT_LINK = sv.compile(".match-info-tournament a")
 
 
 def clean_tournament_name(name: str) -> str:
@@ -312,21 +399,19 @@ def clean_tournament_name(name: str) -> str:
     if not name:
         return name
     s = name.replace("–", "-").replace("—", "-")
-    s = re.sub(r"\s+", " ", s).strip()
+    s = _WS_RE.sub(" ", s).strip()
     return s
 
 
 def _norm_key(s: Optional[str]) -> str:
     s = (s or "").strip().lower()
-    s = re.sub(r"\s+", " ", s)
+    s = _WS_RE.sub(" ", s)
     return s
 
 
 def _tour_key(s: Optional[str]) -> str:
-    base = clean_tournament_name(s or "")
-    base = base.strip().lower()
-    base = re.sub(r"\s+", " ", base)
-    return base
+    # clean_tournament_name уже схлопнул пробелы и обрезал края — остаётся только регистр
+    return clean_tournament_name(s or "").lower()
 
 
 def _parse_score_tuple(score: Optional[str]) -> Optional[Tuple[int, int]]:
@@ -417,9 +502,9 @@ def _slug_from_name(name: str) -> str:
     s = (name or "").strip().lower()
     s = s.replace("&", "and")
     s = s.replace(" ", "_")
-    s = re.sub(r"\s+", "_", s)
+    s = _WS_RE.sub("_", s)
     s = _SLUG_SAFE_RE.sub("", s)
-    s = re.sub(r"_+", "_", s).strip("_")
+    s = _UNDERSCORES_RE.sub("_", s).strip("_")
     return s
 
 def _team_uid_token(name: Optional[str], path: Optional[str], url: Optional[str]) -> str:
@@ -482,6 +567,7 @@ def upsert_team(cur: psycopg.Cursor, name: str, path: str, url: str) -> int:
         RETURNING id;
         """,
         {"path": path, "url": url, "name": name},
+        prepare=True,
     )
     return int(cur.fetchone()[0])
 
@@ -490,8 +576,8 @@ def upsert_team(cur: psycopg.Cursor, name: str, path: str, url: str) -> int:
 # TOURNAMENTS (Main Page) — optional
 # ---------------------------------------------------------------------------
 
-def parse_tournaments_from_main(html: str) -> List[Tournament]:
-    soup = BeautifulSoup(html, "html.parser")
+def parse_tournaments_from_main(html: str | bytes) -> List[Tournament]:
+    soup = BeautifulSoup(html, "lxml")
     result: List[Tournament] = []
 
     status_map: Dict[str, str] = {
@@ -534,14 +620,64 @@ def parse_tournaments_from_main(html: str) -> List[Tournament]:
     return result
 
 
+def _load_main_page_cache() -> Tuple[dict, Optional[bytes]]:
+    """(meta, html) прошлого ответа Main_Page или ({}, None), если кэша нет/он битый."""
+    try:
+        meta = json.loads(MAIN_PAGE_CACHE_META.read_text(encoding="utf-8"))
+        return meta, MAIN_PAGE_CACHE_BODY.read_bytes()
+    except (OSError, ValueError):
+        return {}, None
+
+
+def _save_main_page_cache(resp: requests.Response) -> None:
+    meta = {
+        "etag": resp.headers.get("ETag"),
+        "last_modified": resp.headers.get("Last-Modified"),
+    }
+    if not meta["etag"] and not meta["last_modified"]:
+        return
+    try:
+        MAIN_PAGE_CACHE_BODY.write_bytes(resp.content)
+        MAIN_PAGE_CACHE_META.write_text(json.dumps(meta), encoding="utf-8")
+    except OSError as e:
+        logger.warning("Main_Page cache write failed: %s", e)
+
+
+def _fetch_main_page_if_modified() -> Optional[bytes]:
+    """
+    Условный GET Main_Page с валидаторами из дискового кэша.
+    None — страница не менялась (304) и турниры уже в памяти; на свежем
+    процессе при 304 отдаём копию страницы с диска.
+    """
+    meta, cached_html = _load_main_page_cache()
+    headers: Dict[str, str] = {}
+    if cached_html is not None:
+        if meta.get("etag"):
+            headers["If-None-Match"] = meta["etag"]
+        if meta.get("last_modified"):
+            headers["If-Modified-Since"] = meta["last_modified"]
+
+    resp = HTTP_SESSION.get(MAIN_PAGE_URL, headers=headers or None, timeout=25)
+    if resp.status_code == 304 and cached_html is not None:
+        return None if KNOWN_TOURNAMENTS_BY_NAME else cached_html
+    resp.raise_for_status()
+
+    _save_main_page_cache(resp)
+    return resp.content
+
+
 def sync_tournaments_from_main_page() -> None:
     global KNOWN_TOURNAMENTS_BY_NAME
     try:
-        html = fetch_html(MAIN_PAGE_URL)
+        html = _fetch_main_page_if_modified()
     except Exception as e:
         log_event({"level": "error", "msg": "fetch_cs_main_failed", "error": str(e)})
         return
 
+    if html is None:
+        logger.info("Main_Page (CS) не изменилась, турниров в кэше: %s", len(KNOWN_TOURNAMENTS_BY_NAME))
+        return
+
     tournaments = parse_tournaments_from_main(html)
     mapping: Dict[str, Tournament] = {}
     for t in tournaments:
@@ -569,27 +705,27 @@ def _extract_score_and_bo(container: Tag) -> Tuple[Optional[str], Optional[str]]
         </span>
       </div>
     """
-    sh = container.select_one(".match-info-header-scoreholder")
+    sh = _SEL_SCOREHOLDER.select_one(container)
     if not sh:
         return None, None
 
-    upper = sh.select_one(".match-info-header-scoreholder-upper")
+    upper = _SEL_SCORE_UPPER.select_one(sh)
     upper_txt = upper.get_text(" ", strip=True).lower() if upper else ""
     # upcoming => "vs"
     if upper_txt.strip() == "vs":
         bo_txt = None
-        lower = sh.select_one(".match-info-header-scoreholder-lower")
+        lower = _SEL_SCORE_LOWER.select_one(sh)
         if lower:
             bo_txt = lower.get_text(" ", strip=True) or None
         return None, bo_txt
 
-    nums = [s.get_text(strip=True) for s in sh.select(".match-info-header-scoreholder-score")]
+    nums = [s.get_text(strip=True) for s in _SEL_SCORE_CELLS.select(sh)]
     score = None
     if len(nums) >= 2 and nums[0].isdigit() and nums[1].isdigit():
         score = f"{int(nums[0])}:{int(nums[1])}"
 
     bo_txt = None
-    lower = sh.select_one(".match-info-header-scoreholder-lower")
+    lower = _SEL_SCORE_LOWER.select_one(sh)
     if lower:
         bo_txt = lower.get_text(" ", strip=True) or None
 
@@ -636,9 +772,9 @@ def normalize_match(m: Match) -> Match:
     return m
 
 
-def parse_matches_from_html(html: str) -> List[Match]:
-    soup = BeautifulSoup(html, "html.parser")
-    containers = soup.select(".match-info")
+def parse_matches_from_html(html: str | bytes) -> List[Match]:
+    soup = BeautifulSoup(html, "lxml")
+    containers = _SEL_MATCH_INFO.select(soup)
     logger.info("[DEBUG] .match-info containers: %d", len(containers))
 
     matches: List[Match] = []
@@ -648,7 +784,7 @@ def parse_matches_from_html(html: str) -> List[Match]:
         time_raw: Optional[str] = None
         time_msk: Optional[datetime] = None
 
-        timer = c.select_one(".timer-object")
+        timer = _SEL_TIMER_OBJECT.select_one(c)
         if timer:
             ts = timer.get("data-timestamp")
             if ts and str(ts).isdigit():
@@ -658,17 +794,17 @@ def parse_matches_from_html(html: str) -> List[Match]:
                 except Exception:
                     time_msk = None
 
-            time_el = c.select_one(".timer-object-date")
+            time_el = _SEL_TIMER_DATE.select_one(c)
             time_raw = time_el.get_text(" ", strip=True) if time_el else None
 
         if time_msk is None:
             # fallback: парсим строку + abbr tz
-            time_el = c.select_one(".timer-object-date, .timer-object")
+            time_el = _SEL_TIMER.select_one(c)
             time_raw = time_el.get_text(" ", strip=True) if time_el else None
             time_msk = parse_time_to_target_tz(time_raw or "", TARGET_TZ, container=c, tz_map=TZ_IANA_MAP)
 
         # -------------------- TEAMS (+ URL/PATH) --------------------
-        team_links = c.select(".match-info-header-opponent .name a")
+        team_links = _SEL_TEAM_LINKS.select(c)
         t1_tag = team_links[0] if len(team_links) >= 1 else None
         t2_tag = team_links[1] if len(team_links) >= 2 else None
 
@@ -683,17 +819,17 @@ def parse_matches_from_html(html: str) -> List[Match]:
 
         # приводим Bo к единому виду (Bo5)
         if bo_text:
-            m = re.search(r"bo\s*([0-9]+)", bo_text, flags=re.IGNORECASE)
+            m = _BO_TEXT_RE.search(bo_text)
             if m:
                 bo_text = f"Bo{m.group(1)}"
 
         # -------------------- TOURNAMENT --------------------
         tournament = None
-        t_el = c.select_one(".match-info-tournament-name span")
+        t_el = _SEL_TOURNAMENT_NAME.select_one(c)
         if t_el:
             tournament = t_el.get_text(strip=True) or None
         else:
-            a = c.select_one(".match-info-tournament a")
+            a = _SEL_TOURNAMENT_LINK.select_one(c)
             if a:
                 tournament = a.get_text(" ", strip=True) or None
 
@@ -706,8 +842,8 @@ def parse_matches_from_html(html: str) -> List[Match]:
         if timer:
             finished_flag = (timer.get("data-finished") or "").strip().lower()
 
-        sh = c.select_one(".match-info-header-scoreholder")
-        upper = sh.select_one(".match-info-header-scoreholder-upper") if sh else None
+        sh = _SEL_SCOREHOLDER.select_one(c)
+        upper = _SEL_SCORE_UPPER.select_one(sh) if sh else None
         upper_txt = upper.get_text(" ", strip=True).lower() if upper else ""
 
         bo_int = parse_bo_int(bo_text)
@@ -762,7 +898,7 @@ def parse_matches_from_html(html: str) -> List[Match]:
 def build_match_uid(m: Match) -> Optional[str]:
     if not m.match_url:
         return None
-    mm = re.search(r"Match:(ID_[^&#/?]+)", m.match_url)
+    mm = _MATCH_URL_ID_RE.search(m.match_url)
     if mm:
         return f"lp:{mm.group(1)}"
     return None
@@ -778,7 +914,7 @@ def _uid_team_part(m: Match, which: int) -> str:
         ref = m.team2_path or _url_to_team_path(m.team2_url) or (m.team2 or "")
     ref = (ref or "").strip().lower()
     ref = ref.replace(" ", "_")
-    ref = re.sub(r"\s+", "_", ref)
+    ref = _WS_RE.sub("_", ref)
     return ref
 
 
@@ -820,8 +956,7 @@ def deduplicate_duplicates_in_db() -> None:
     Оставляет самый ранний id для каждой группы дубликатов.
     """
     with get_db_connection() as conn:
-        ensure_cs2_teams_table(conn)
-        ensure_cs2_matches_table(conn)
+        init_schema(conn)
 
         with conn.cursor() as cur:
             cur.execute(f"""
@@ -846,8 +981,7 @@ def deduplicate_duplicates_in_db() -> None:
 
 def auto_repair_matches() -> None:
     with get_db_connection() as conn:
-        ensure_cs2_teams_table(conn)
-        ensure_cs2_matches_table(conn)
+        init_schema(conn)
 
         with conn.cursor() as cur:
             cur.execute(f"DELETE FROM public.{MATCHES_TABLE} WHERE match_uid IS NULL OR match_uid = '';")
@@ -883,8 +1017,9 @@ def save_matches_to_db(matches: List[Match], max_retries: int = 3) -> None:
 
 def _save_matches_to_db_impl(matches: List[Match]) -> None:
     with get_db_connection() as conn:
-        ensure_cs2_teams_table(conn)
-        ensure_cs2_matches_table(conn)
+        init_schema(conn)
+
+        upsert_rows: List[dict] = []
 
         with conn.cursor() as cur:
             for m in matches:
@@ -914,11 +1049,34 @@ def _save_matches_to_db_impl(matches: List[Match]) -> None:
                 match_uid = build_match_uid(m) or build_fallback_match_uid(m)
 
                 liqui_id = None
-                mm = re.search(r"^lp:(ID_[^|]+)$", match_uid)
+                mm = _LP_UID_RE.search(match_uid)
                 if mm:
                     liqui_id = mm.group(1)
 
-                cur.execute(
+                upsert_rows.append(
+                    {
+                        "match_time_msk": m.time_msk,
+                        "match_time_raw": m.time_raw,
+                        "team1": m.team1,
+                        "team2": m.team2,
+                        "team1_id": team1_id,
+                        "team2_id": team2_id,
+                        "team1_url": team1_url_db,
+                        "team2_url": team2_url_db,
+                        "score": m.score,
+                        "bo": bo_int,
+                        "tournament": m.tournament,
+                        "status": m.status,
+                        "match_uid": match_uid,
+                        "match_url": m.match_url,
+                        "liqui_id": liqui_id,
+                    },
+                )
+
+            # один executemany на весь проход (psycopg3 шлёт его через pipeline)
+            # вместо отдельного round-trip на каждый матч
+            if upsert_rows:
+                cur.executemany(
                     f"""
                     INSERT INTO public.{MATCHES_TABLE} (
                         match_time_msk,
@@ -983,25 +1141,25 @@ def _save_matches_to_db_impl(matches: List[Match]) -> None:
                         match_url = COALESCE(EXCLUDED.match_url, public.{MATCHES_TABLE}.match_url),
                         liquipedia_match_id = COALESCE(EXCLUDED.liquipedia_match_id, public.{MATCHES_TABLE}.liquipedia_match_id),
 
-                        updated_at = now();
+                        updated_at = now()
+                    -- повторный скрейп того же матча без изменений не переписывает строку
+                    WHERE
+                        (EXCLUDED.match_time_msk IS NOT NULL AND EXCLUDED.match_time_msk IS DISTINCT FROM public.{MATCHES_TABLE}.match_time_msk)
+                        OR (EXCLUDED.match_time_raw IS NOT NULL AND EXCLUDED.match_time_raw IS DISTINCT FROM public.{MATCHES_TABLE}.match_time_raw)
+                        OR (EXCLUDED.team1 IS NOT NULL AND EXCLUDED.team1 IS DISTINCT FROM public.{MATCHES_TABLE}.team1)
+                        OR (EXCLUDED.team2 IS NOT NULL AND EXCLUDED.team2 IS DISTINCT FROM public.{MATCHES_TABLE}.team2)
+                        OR (EXCLUDED.team1_id IS NOT NULL AND EXCLUDED.team1_id IS DISTINCT FROM public.{MATCHES_TABLE}.team1_id)
+                        OR (EXCLUDED.team2_id IS NOT NULL AND EXCLUDED.team2_id IS DISTINCT FROM public.{MATCHES_TABLE}.team2_id)
+                        OR (EXCLUDED.team1_url IS NOT NULL AND EXCLUDED.team1_url IS DISTINCT FROM public.{MATCHES_TABLE}.team1_url)
+                        OR (EXCLUDED.team2_url IS NOT NULL AND EXCLUDED.team2_url IS DISTINCT FROM public.{MATCHES_TABLE}.team2_url)
+                        OR (EXCLUDED.score IS NOT NULL AND EXCLUDED.score IS DISTINCT FROM public.{MATCHES_TABLE}.score)
+                        OR (EXCLUDED.bo IS NOT NULL AND EXCLUDED.bo IS DISTINCT FROM public.{MATCHES_TABLE}.bo)
+                        OR (EXCLUDED.tournament IS NOT NULL AND EXCLUDED.tournament IS DISTINCT FROM public.{MATCHES_TABLE}.tournament)
+                        OR (public.{MATCHES_TABLE}.status IS DISTINCT FROM 'finished' AND EXCLUDED.status IS NOT NULL AND EXCLUDED.status IS DISTINCT FROM public.{MATCHES_TABLE}.status)
+                        OR (EXCLUDED.match_url IS NOT NULL AND EXCLUDED.match_url IS DISTINCT FROM public.{MATCHES_TABLE}.match_url)
+                        OR (EXCLUDED.liquipedia_match_id IS NOT NULL AND EXCLUDED.liquipedia_match_id IS DISTINCT FROM public.{MATCHES_TABLE}.liquipedia_match_id);
                     """,
-                    {
-                        "match_time_msk": m.time_msk,
-                        "match_time_raw": m.time_raw,
-                        "team1": m.team1,
-                        "team2": m.team2,
-                        "team1_id": team1_id,
-                        "team2_id": team2_id,
-                        "team1_url": team1_url_db,
-                        "team2_url": team2_url_db,
-                        "score": m.score,
-                        "bo": bo_int,
-                        "tournament": m.tournament,
-                        "status": m.status,
-                        "match_uid": match_uid,
-                        "match_url": m.match_url,
-                        "liqui_id": liqui_id,
-                    },
+                    upsert_rows,
                 )
 
         conn.commit()
@@ -1129,7 +1287,7 @@ def update_scores_from_match_pages() -> None:
             return None
 
         s = s.replace(" ", "_")
-        s = re.sub(r"/+$", "", s)
+        s = _TRAILING_SLASHES_RE.sub("", s)
         return s.lower()
 
     def pair_key_from_match(m: Match) -> Optional[frozenset[str]]:
@@ -1199,8 +1357,7 @@ def update_scores_from_match_pages() -> None:
     logger.info("[SCORE] completed index: by_pair=%d by_names=%d", len(by_pair), len(by_names))
 
     with get_db_connection() as conn:
-        ensure_cs2_teams_table(conn)
-        ensure_cs2_matches_table(conn)
+        init_schema(conn)
 
         with conn.cursor() as cur:
             cur.execute(
@@ -1314,39 +1471,50 @@ def update_scores_from_match_pages() -> None:
 
 def refresh_statuses_in_db() -> None:
     with get_db_connection() as conn:
-        ensure_cs2_teams_table(conn)
-        ensure_cs2_matches_table(conn)
+        init_schema(conn)
 
         with conn.cursor() as cur:
             cur.execute(
                 f"""
-                UPDATE public.{MATCHES_TABLE}
-                SET status = CASE
-                    WHEN status = 'finished' THEN 'finished'
-
-                    WHEN bo IS NOT NULL
-                         AND score IS NOT NULL AND score <> ''
-                         AND score ~ '^[0-9]+:[0-9]+$'
-                         AND GREATEST(split_part(score, ':', 1)::int, split_part(score, ':', 2)::int) >= ((bo / 2)::int + 1)
-                    THEN 'finished'
-
-                    WHEN match_time_msk > now() + INTERVAL '5 minutes'
-                    THEN 'upcoming'
-
-                    WHEN match_time_msk <= now() - INTERVAL '5 minutes'
-                         AND (status IS NULL OR status IN ('unknown', 'upcoming'))
-                    THEN 'live'
-
-                    ELSE status
-                END,
-                updated_at = now()
-                WHERE match_time_msk IS NOT NULL;
+                UPDATE public.{MATCHES_TABLE} AS d
+                SET status = s.new_status,
+                    updated_at = now()
+                FROM (
+                    SELECT
+                        id,
+                        CASE
+                            WHEN status = 'finished' THEN 'finished'
+
+                            WHEN bo IS NOT NULL
+                                 AND score IS NOT NULL AND score <> ''
+                                 AND score ~ '^[0-9]+:[0-9]+$'
+                                 AND GREATEST(split_part(score, ':', 1)::int, split_part(score, ':', 2)::int) >= ((bo / 2)::int + 1)
+                            THEN 'finished'
+
+                            WHEN match_time_msk > now() + INTERVAL '5 minutes'
+                            THEN 'upcoming'
+
+                            WHEN match_time_msk <= now() - INTERVAL '5 minutes'
+                                 AND (status IS NULL OR status IN ('unknown', 'upcoming'))
+                            THEN 'live'
+
+                            ELSE status
+                        END AS new_status
+                    FROM public.{MATCHES_TABLE}
+                    WHERE match_time_msk IS NOT NULL
+                      AND status IS DISTINCT FROM 'finished'
+                ) AS s
+                WHERE d.id = s.id
+                  -- переписываем только строки, где статус реально меняется
+                  AND d.status IS DISTINCT FROM s.new_status;
                 """
             )
 
+            changed = cur.rowcount
+
         conn.commit()
 
-    logger.info("Статусы матчей обновлены по времени/BO")
+    logger.info("Статусы матчей обновлены по времени/BO: изменено %d", changed)
 
 
 # ---------------------------------------------------------------------------
@@ -1432,6 +1600,8 @@ def worker_loop() -> None:
 
 
 def main() -> None:
+    with get_db_connection() as conn:
+        init_schema(conn)
     worker_once()
 
 
@@ -19,16 +19,24 @@ import logging
 from logging.handlers import RotatingFileHandler
 import os
 import re
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from dataclasses import dataclass
 from datetime import datetime, timedelta, timezone
 from pathlib import Path
-from typing import Optional, Dict, List, Tuple
+from typing import Optional, Dict, Iterator, List, Tuple
 
 import psycopg
 from psycopg import errors
+from psycopg.conninfo import make_conninfo
+from psycopg_pool import ConnectionPool
 import requests
-from bs4 import BeautifulSoup, Tag
+from requests.adapters import HTTPAdapter
+from bs4 import BeautifulSoup, SoupStrainer, Tag
+import soupsieve as sv
+from lxml import etree, html as lxml_html
 from dotenv import load_dotenv
 from urllib.parse import urljoin, urlparse, parse_qs, urlencode
 
@@ -77,7 +85,7 @@ logger = logging.getLogger(__name__)
 
 def log_event(event: dict):
     """Log structured event as JSON."""
-    event["time"] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    event["time"] = time.strftime("%Y-%m-%d %H:%M:%S")
     line = json.dumps(event, ensure_ascii=False)
     logger.info(line)
 
@@ -111,6 +119,18 @@ HEADERS = {
 HTTP_MAX_RETRIES = int(os.getenv("HTTP_MAX_RETRIES", "3"))
 HTTP_BACKOFF_BASE_SECONDS = float(os.getenv("HTTP_BACKOFF_BASE_SECONDS", "1.5"))
 HTTP_BLOCK_SECONDS = int(os.getenv("HTTP_BLOCK_SECONDS", "120"))
+# сколько страниц матчей качаем параллельно при обновлении счёта (не больше — Liquipedia режет)
+MATCH_PAGE_FETCH_WORKERS = int(os.getenv("MATCH_PAGE_FETCH_WORKERS", "4"))
+
+# Одна сессия на процесс: keep-alive к liquipedia.net вместо нового TCP/TLS на каждый запрос.
+# Пул не меньше числа потоков, качающих страницы матчей.
+HTTP_SESSION = requests.Session()
+HTTP_SESSION.headers.update(HEADERS)
+HTTP_SESSION.headers.update({"Accept-Encoding": "gzip, deflate", "Connection": "keep-alive"})
+HTTP_SESSION.mount(
+    "https://",
+    HTTPAdapter(pool_connections=4, pool_maxsize=max(8, MATCH_PAGE_FETCH_WORKERS)),
+)
 
 _LIQUIPEDIA_BLOCKED_UNTIL = 0.0
 
@@ -181,6 +201,19 @@ class Tournament:
 
 # кэш турниров по "очищенному" имени
 KNOWN_TOURNAMENTS_BY_NAME: Dict[str, Tournament] = {}
+# Main_Page между запусками: юниты systemd гоняют парсер по одному проходу,
+# поэтому ETag / Last-Modified и тело страницы держим на диске (как кэш портала команд)
+PARSER_CACHE_DIR = Path(os.getenv("PARSER_CACHE_DIR", LOG_DIR))
+MAIN_PAGE_CACHE_BODY = PARSER_CACHE_DIR / "dota_main_page.html"
+MAIN_PAGE_CACHE_META = PARSER_CACHE_DIR / "dota_main_page.meta"
+# страницы матчей: match_url -> (etag, last_modified, (score, bo_text)).
+# Завершённые матчи почти не меняются — повторный проход получает 304 и не парсит страницу.
+# Между запусками кэш живёт в MATCH_PAGE_CACHE_FILE (по той же причине, что и Main_Page).
+MATCH_PAGE_CACHE_MAX = int(os.getenv("MATCH_PAGE_CACHE_MAX", "2000"))
+MATCH_PAGE_CACHE_FILE = PARSER_CACHE_DIR / "dota_match_pages.json"
+_MATCH_PAGE_CACHE: Dict[str, Tuple[Optional[str], Optional[str], Tuple[Optional[str], Optional[str]]]] = {}
+_MATCH_PAGE_CACHE_LOCK = threading.Lock()  # страницы качаются из пула потоков
+_MATCH_PAGE_CACHE_LOADED = False
 
 
 # ---------------------------------------------------------------------------
@@ -208,7 +241,7 @@ def sanitize_match_url(url: Optional[str]) -> Optional[str]:
         clean_query = {"title": title}
         return urljoin(BASE_URL, f"/dota2/index.php?{urlencode(clean_query)}")
 
-    m = re.search(r"Match:(ID_[^&#/?]+)", url)
+    m = _MATCH_URL_ID_RE.search(url)
     if m:
         liqui_id = m.group(1)
         return urljoin(BASE_URL, f"/dota2/index.php?title=Match:{liqui_id}")
@@ -224,14 +257,15 @@ def _is_liquipedia_blocked() -> bool:
     return time.time() < _LIQUIPEDIA_BLOCKED_UNTIL
 
 
-def fetch_html(url: str) -> str:
+def _http_get(url: str, headers: Optional[Dict[str, str]] = None) -> requests.Response:
+    """GET с ретраями и блокировкой на 403/429; 304 считается успешным ответом."""
     if _is_liquipedia_blocked():
         raise RuntimeError("Liquipedia temporarily blocked, skipping request")
 
     last_exc: Exception | None = None
     for attempt in range(1, HTTP_MAX_RETRIES + 1):
         try:
-            resp = requests.get(url, headers=HEADERS, timeout=15)
+            resp = HTTP_SESSION.get(url, headers=headers, timeout=15)
             if resp.status_code in (403, 429):
                 _set_liquipedia_blocked()
                 last_exc = requests.HTTPError(
@@ -242,7 +276,7 @@ def fetch_html(url: str) -> str:
                     continue
                 raise last_exc
             resp.raise_for_status()
-            return resp.text
+            return resp
         except Exception as e:
             last_exc = e
             if attempt < HTTP_MAX_RETRIES:
@@ -254,14 +288,49 @@ def fetch_html(url: str) -> str:
     raise RuntimeError("fetch_html failed with unknown error")
 
 
-def get_db_connection() -> psycopg.Connection:
-    return psycopg.connect(
-        host=DB_HOST,
-        port=DB_PORT,
-        dbname=DB_NAME,
-        user=DB_USER,
-        password=DB_PASSWORD,
-    )
+def fetch_html(url: str) -> bytes:
+    # Сырые байты: BeautifulSoup/lxml сами определят кодировку по <meta charset>,
+    # без лишней копии страницы в виде str.
+    return _http_get(url).content
+
+
+_DB_POOL: Optional[ConnectionPool] = None
+
+
+def _get_db_pool() -> ConnectionPool:
+    global _DB_POOL
+    if _DB_POOL is None:
+        # synchronous_commit=off только для сессии парсера: COMMIT не ждёт fsync WAL.
+        # Потерять последние секунды скрейпа при падении БД не страшно — следующий
+        # проход всё перекачает.
+        _DB_POOL = ConnectionPool(
+            make_conninfo(
+                host=DB_HOST,
+                port=DB_PORT,
+                dbname=DB_NAME,
+                user=DB_USER,
+                password=DB_PASSWORD,
+                options="-c synchronous_commit=off",
+            ),
+            min_size=1,
+            max_size=1,
+            # соединение, отвалившееся в простое между проходами (рестарт БД,
+            # idle-таймаут), проверяется перед выдачей и молча пересоздаётся
+            check=ConnectionPool.check_connection,
+            open=True,
+        )
+    return _DB_POOL
+
+
+@contextmanager
+def get_db_connection() -> Iterator[psycopg.Connection]:
+    """
+    Соединение из пула на одно соединение вместо connect/close в каждой функции прохода.
+    Семантика `with` как у psycopg: commit при успехе, rollback при исключении —
+    только соединение возвращается в пул, а не закрывается.
+    """
+    with _get_db_pool().connection() as conn:
+        yield conn
 
 
 def _get_match_counts() -> tuple[int, int]:
@@ -271,22 +340,27 @@ def _get_match_counts() -> tuple[int, int]:
 
     with get_db_connection() as conn:
         with conn.cursor() as cur:
-            cur.execute("SELECT COUNT(*) FROM dota_matches;")
-            (total,) = cur.fetchone()
+            # оба счётчика за один проход по таблице
             cur.execute(
                 """
-                SELECT COUNT(*)
-                FROM dota_matches
-                WHERE match_time_msk >= %s AND match_time_msk < %s;
+                SELECT
+                    COUNT(*),
+                    COUNT(*) FILTER (WHERE match_time_msk >= %s AND match_time_msk < %s)
+                FROM dota_matches;
                 """,
                 (start_dt, end_dt),
             )
-            (today,) = cur.fetchone()
+            total, today = cur.fetchone()
 
     return int(total), int(today)
 
 
 
+_TOURNAMENT_SUFFIX_RE = re.compile(
+    r"\s*-\s*(?:Playoffs?|Groups?|Group\s+[A-Z]|November\s+\d+-[A-Z]|December\s+\d+-[A-Z]|Play-In|Qualifier[s]?)"
+)
+
+
 def clean_tournament_name(tournament_name: str) -> str:
     """
     Очистка названия турнира от суффиксов:
@@ -297,11 +371,7 @@ def clean_tournament_name(tournament_name: str) -> str:
     if not tournament_name:
         return tournament_name
 
-    cleaned = re.split(
-        r"\s*-\s*(?:Playoffs?|Groups?|Group\s+[A-Z]|November\s+\d+-[A-Z]|December\s+\d+-[A-Z]|Play-In|Qualifier[s]?)",
-        tournament_name,
-        maxsplit=1,
-    )[0]
+    cleaned = _TOURNAMENT_SUFFIX_RE.split(tournament_name, maxsplit=1)[0]
 
     return cleaned.strip()
 
@@ -316,29 +386,39 @@ def auto_repair_matches() -> None:
       4) Проставляет liquipedia_match_id там, где его можно вывести из match_uid / match_url.
     """
     with get_db_connection() as conn:
-        with conn.cursor() as cur:
+        # Все шаги уходят одним пакетом (pipeline mode), без ожидания ответа на каждый.
+        # У каждого шага свой курсор, чтобы после синхронизации прочитать его rowcount.
+        steps: Dict[str, psycopg.Cursor] = {}
+
+        def _run(key: str, sql: str) -> None:
+            cur = conn.cursor()
+            cur.execute(sql)
+            steps[key] = cur
+
+        with conn.pipeline():
             # 1) Удаляем строки без match_uid (то, что ты уже делал руками)
-            cur.execute(
+            _run(
+                "deleted_no_uid",
                 """
                 DELETE FROM dota_matches
                 WHERE match_uid IS NULL OR match_uid = '';
                 """
             )
-            deleted_no_uid = cur.rowcount
 
             # 1б) Удаляем строки, где обе команды — плейсхолдеры (TBD/TBA/пусто)
-            cur.execute(
+            _run(
+                "deleted_placeholder_teams",
                 """
                 DELETE FROM dota_matches
                 WHERE (team1 IS NULL OR trim(team1) = '' OR lower(team1) IN ('tbd','tba','to be decided','to be determined'))
                   AND (team2 IS NULL OR trim(team2) = '' OR lower(team2) IN ('tbd','tba','to be decided','to be determined'));
                 """
             )
-            deleted_placeholder_teams = cur.rowcount
 
             # 2) Удаляем TBD-плейсхолдеры,
             #    если в этом же слоте (время+турнир) уже есть матч с нормальными командами
-            cur.execute(
+            _run(
+                "deleted_tbd",
                 """
                 DELETE FROM dota_matches d
                 WHERE (d.team1 = 'TBD' OR d.team2 = 'TBD')
@@ -353,11 +433,11 @@ def auto_repair_matches() -> None:
                   );
                 """
             )
-            deleted_tbd = cur.rowcount
 
             # 2б) Удаляем TBD-плейсхолдеры с разницей по времени (до 15 минут),
             #     если есть матч с реальными командами и совпадающим известным соперником
-            cur.execute(
+            _run(
+                "deleted_tbd_time_window",
                 """
                 DELETE FROM dota_matches d
                 WHERE (d.team1 = 'TBD' OR d.team2 = 'TBD')
@@ -381,11 +461,11 @@ def auto_repair_matches() -> None:
                   );
                 """
             )
-            deleted_tbd_time_window = cur.rowcount
 
             # 2в) Удаляем дубли по time_raw + команды/турнир/bo,
             #     если есть версия с lp:ID (часто из-за кривого парсинга таймзон).
-            cur.execute(
+            _run(
+                "deleted_raw_dupes",
                 """
                 DELETE FROM dota_matches d
                 WHERE d.match_uid NOT LIKE 'lp:ID_%'
@@ -403,9 +483,9 @@ def auto_repair_matches() -> None:
                   );
                 """
             )
-            deleted_raw_dupes = cur.rowcount
             # 3а) Нормализуем законченные матчи без команд: считаем их ещё не валидными
-            cur.execute(
+            _run(
+                "fixed_finished_no_teams",
                 """
                 UPDATE dota_matches
                 SET status = 'unknown',
@@ -416,10 +496,10 @@ def auto_repair_matches() -> None:
                   AND (team2 IS NULL OR team2 = '');
                 """
             )
-            fixed_finished_no_teams = cur.rowcount
 
             # 3б) Finished + счёт 0:0 тоже считаем подозрительным
-            cur.execute(
+            _run(
+                "fixed_finished_zero_zero",
                 """
                 UPDATE dota_matches
                 SET status = 'unknown',
@@ -429,10 +509,10 @@ def auto_repair_matches() -> None:
                   AND score = '0:0';
                 """
             )
-            fixed_finished_zero_zero = cur.rowcount
 
             # 4а) Проставляем liquipedia_match_id из match_uid формата "lp:ID_xxx"
-            cur.execute(
+            _run(
+                "updated_from_uid",
                 """
                 UPDATE dota_matches
                 SET liquipedia_match_id = substring(match_uid FROM '^lp:(ID_[^|]+)')
@@ -440,10 +520,10 @@ def auto_repair_matches() -> None:
                   AND match_uid LIKE 'lp:ID_%';
                 """
             )
-            updated_from_uid = cur.rowcount
 
             # 4б) Проставляем liquipedia_match_id из match_url (если есть Match:ID_xxx)
-            cur.execute(
+            _run(
+                "updated_from_url",
                 """
                 UPDATE dota_matches
                 SET liquipedia_match_id = substring(match_url FROM 'Match:(ID_[^&#/?]+)')
@@ -451,20 +531,20 @@ def auto_repair_matches() -> None:
                   AND match_url LIKE '%Match:ID_%';
                 """
             )
-            updated_from_url = cur.rowcount
 
+        counts = {key: cur.rowcount for key, cur in steps.items()}
         conn.commit()
 
     print(
-        f"[AUTO-REPAIR] deleted_no_uid={deleted_no_uid}, "
-        f"deleted_placeholder_teams={deleted_placeholder_teams}, "
-        f"deleted_tbd={deleted_tbd}, "
-        f"deleted_tbd_time_window={deleted_tbd_time_window}, "
-        f"deleted_raw_dupes={deleted_raw_dupes}, "
-        f"fixed_finished_no_teams={fixed_finished_no_teams}, "
-        f"fixed_finished_zero_zero={fixed_finished_zero_zero}, "
-        f"liqui_from_uid={updated_from_uid}, "
-        f"liqui_from_url={updated_from_url}"
+        f"[AUTO-REPAIR] deleted_no_uid={counts['deleted_no_uid']}, "
+        f"deleted_placeholder_teams={counts['deleted_placeholder_teams']}, "
+        f"deleted_tbd={counts['deleted_tbd']}, "
+        f"deleted_tbd_time_window={counts['deleted_tbd_time_window']}, "
+        f"deleted_raw_dupes={counts['deleted_raw_dupes']}, "
+        f"fixed_finished_no_teams={counts['fixed_finished_no_teams']}, "
+        f"fixed_finished_zero_zero={counts['fixed_finished_zero_zero']}, "
+        f"liqui_from_uid={counts['updated_from_uid']}, "
+        f"liqui_from_url={counts['updated_from_url']}"
     )
 
 import re
@@ -474,7 +554,9 @@ SCORE_RE = re.compile(r'(\d+)\s*[:\-]\s*(\d+)')
 BO_RE = re.compile(r'\(Bo\s*([0-9]+)\)', re.IGNORECASE)
 
 
-def parse_score_and_bo_from_container(container: Tag) -> tuple[Optional[str], Optional[str]]:
+def parse_score_and_bo_from_container(
+    container: Tag, text: Optional[str] = None
+) -> tuple[Optional[str], Optional[str]]:
     """
     Универсальный парсер счёта и Bo по тексту всего контейнера матча.
 
@@ -485,8 +567,10 @@ def parse_score_and_bo_from_container(container: Tag) -> tuple[Optional[str], Op
     Возвращает:
       score: строка вида "0:1"
       bo: строка вида "Bo3" (дальше превратится в int через parse_bo_int)
+    text — уже собранный текст контейнера, если вызывающий его посчитал.
     """
-    text = " ".join(container.stripped_strings)
+    if text is None:
+        text = " ".join(container.stripped_strings)
     if not text:
         return None, None
 
@@ -555,14 +639,14 @@ TIME_RE = re.compile(
 # ТУРНИРЫ
 # ---------------------------------------------------------------------------
 
-def parse_tournaments_from_main(html: str) -> List[Tournament]:
+def parse_tournaments_from_main(html: str | bytes) -> List[Tournament]:
     """
     Примерная логика:
     - на главной странице турниры сгруппированы под заголовками:
       "Ongoing", "Upcoming & Qualifiers", "Recent Results" и т.п.
     - мы пытаемся по тексту заголовков понять статус, затем забрать <ul> ниже.
     """
-    soup = BeautifulSoup(html, "html.parser")
+    soup = BeautifulSoup(html, "lxml")
     result: List[Tournament] = []
 
     status_map: Dict[str, str] = {
@@ -609,15 +693,62 @@ def parse_tournaments_from_main(html: str) -> List[Tournament]:
     return result
 
 
+def _load_main_page_cache() -> Tuple[dict, Optional[bytes]]:
+    """(meta, html) прошлого ответа Main_Page или ({}, None), если кэша нет/он битый."""
+    try:
+        meta = json.loads(MAIN_PAGE_CACHE_META.read_text(encoding="utf-8"))
+        return meta, MAIN_PAGE_CACHE_BODY.read_bytes()
+    except (OSError, ValueError):
+        return {}, None
+
+
+def _save_main_page_cache(resp: requests.Response) -> None:
+    meta = {
+        "etag": resp.headers.get("ETag"),
+        "last_modified": resp.headers.get("Last-Modified"),
+    }
+    if not meta["etag"] and not meta["last_modified"]:
+        return
+    try:
+        MAIN_PAGE_CACHE_BODY.write_bytes(resp.content)
+        MAIN_PAGE_CACHE_META.write_text(json.dumps(meta), encoding="utf-8")
+    except OSError as e:
+        logger.warning("Main_Page cache write failed: %s", e)
+
+
+def _fetch_main_page_if_modified() -> Optional[bytes]:
+    """
+    Условный GET Main_Page с валидаторами из дискового кэша.
+    None — страница не менялась (304) и турниры уже в памяти; на свежем
+    процессе при 304 отдаём копию страницы с диска.
+    """
+    meta, cached_html = _load_main_page_cache()
+    headers: Dict[str, str] = {}
+    if cached_html is not None:
+        if meta.get("etag"):
+            headers["If-None-Match"] = meta["etag"]
+        if meta.get("last_modified"):
+            headers["If-Modified-Since"] = meta["last_modified"]
+
+    # ретраи и блокировка на 403/429 — как у fetch_html
+    resp = _http_get(MAIN_PAGE_URL, headers=headers or None)
+    if resp.status_code == 304 and cached_html is not None:
+        return None if KNOWN_TOURNAMENTS_BY_NAME else cached_html
+
+    _save_main_page_cache(resp)
+    return resp.content
+
+
 def sync_tournaments_from_main_page() -> None:
     """
     Подтягиваем актуальные турниры с главной страницы и обновляем кэш
     KNOWN_TOURNAMENTS_BY_NAME по очищенному имени.
+    Если Main_Page не менялась (304), кэш остаётся как есть.
     """
     global KNOWN_TOURNAMENTS_BY_NAME
 
     try:
-        html = fetch_html(MAIN_PAGE_URL)
+        html = _fetch_main_page_if_modified()
     except Exception as e:
         log_event(
             {
@@ -628,6 +759,10 @@ def sync_tournaments_from_main_page() -> None:
         )
         return
 
+    if html is None:
+        logger.info("Main_Page не изменилась, турниров в кэше: %s", len(KNOWN_TOURNAMENTS_BY_NAME))
+        return
+
     tournaments = parse_tournaments_from_main(html)
     mapping: Dict[str, Tournament] = {}
 
@@ -639,6 +774,42 @@ def sync_tournaments_from_main_page() -> None:
     logger.info("Синхронизировано турниров: %s", len(KNOWN_TOURNAMENTS_BY_NAME))
 
 _SCORE_RE = re.compile(r"^\s*(\d+)\s*[:\-]\s*(\d+)\s*$")
+_STRICT_SCORE_RE = re.compile(r"^(\d+)\s*[:\-]\s*(\d+)$")
+_FALLBACK_TIME_RE = re.compile(
+    r"[A-Za-z]+\s+\d{1,2},\s+\d{4}\s*-\s*\d{1,2}:\d{2}\s*[A-Z]{2,4}"
+)
+_MATCH_ID_RE = re.compile(r"Match:(ID_[^ \t&#/?]+)")
+_MATCH_URL_ID_RE = re.compile(r"Match:(ID_[^&#/?]+)")
+_LIQUI_ID_RE = re.compile(r"(ID_[A-Za-z0-9]+(?:_[0-9A-Za-z\-]+)*)")
+_URL_QUERY_ID_RE = re.compile(r"(ID_[A-Za-z0-9]+(?:_[0-9A-Za-z\-]+)?)")
+# CSS-селекторы компилируем один раз, а не на каждый select() по контейнеру
+_SEL_MATCH_INFO = sv.compile(".match-info")
+_SEL_TIMER = sv.compile(".timer-object-date, .timer-object")
+_SEL_TEAM_LINKS = sv.compile(".team-template-text a, .team-template-image-icon + span.name a")
+_SEL_SCORE_WRAPPER = sv.compile(".match-info-header-scoreholder-scorewrapper")
+_SEL_SCORE_UPPER = sv.compile(".match-info-header-scoreholder-upper")
+_SEL_SCORE_LOWER = sv.compile(".match-info-header-scoreholder-lower")
+_SEL_TOURNAMENT_NAME = sv.compile(".match-info-tournament a span")
+_SEL_MATCH_STATUS = sv.compile(".match-status")
+_SEL_MATCH_PAGE_LINK = sv.compile(".match-page-button a")
+# Страницы матчей читаем только внутри .match-info — остальное дерево не строим
+# (регулярка, а не строка: строковый class_ в strainer'е не ловит "match-info foo")
+_MATCH_INFO_ONLY = SoupStrainer(class_=re.compile(r"(?:^|\s)match-info(?:\s|$)"))
+
+
+def _status_from_text(text: str) -> Optional[str]:
+    """
+    Статус по тексту .match-status. Порядок проверок — приоритет:
+    live > upcoming/scheduled > completed/finished, где бы слово ни стояло в тексте.
+    """
+    txt = text.lower()
+    if "live" in txt:
+        return "live"
+    if "upcoming" in txt or "scheduled" in txt:
+        return "upcoming"
+    if "completed" in txt or "finished" in txt:
+        return "finished"
+    return None
 
 
 def _clean_str(s: Optional[str]) -> Optional[str]:
@@ -701,26 +872,27 @@ def normalize_match(m: Match) -> Match:
 # ---------------------------------------------------------------------------
 
 
-def parse_matches_from_html(html: str) -> List[Match]:
-    soup = BeautifulSoup(html, "html.parser")
+def parse_matches_from_html(html: str | bytes) -> List[Match]:
+    soup = BeautifulSoup(html, "lxml", parse_only=_MATCH_INFO_ONLY)
 
-    containers = soup.select(".match-info")
+    containers = _SEL_MATCH_INFO.select(soup)
     print(f"[DEBUG] Найдено контейнеров .match-info: {len(containers)}")
 
     matches: List[Match] = []
 
     for container in containers:
+        # общий текст контейнера нужен только в fallback'ах — собираем его
+        # (обход всего поддерева) максимум один раз на контейнер
+        text_block: Optional[str] = None
+
         # --- Время ---
-        time_el = container.select_one(".timer-object-date, .timer-object")
+        time_el = _SEL_TIMER.select_one(container)
         time_raw: Optional[str] = time_el.get_text(strip=True) if time_el else None
 
         if not time_raw:
             # Fallback: пробуем вытащить время из общего текста контейнера
             text_block = " ".join(container.stripped_strings)
-            m_time = re.search(
-                r"[A-Za-z]+\s+\d{1,2},\s+\d{4}\s*-\s*\d{1,2}:\d{2}\s*[A-Z]{2,4}",
-                text_block,
-            )
+            m_time = _FALLBACK_TIME_RE.search(text_block)
             if m_time:
                 time_raw = m_time.group(0)
 
@@ -735,9 +907,7 @@ def parse_matches_from_html(html: str) -> List[Match]:
 
 
         # --- Команды ---
-        teams = container.select(
-            ".team-template-text a, .team-template-image-icon + span.name a"
-        )
+        teams = _SEL_TEAM_LINKS.select(container)
         team1 = (
             normalize_team_name(extract_team_name_from_tag(teams[0]))
             if len(teams) >= 1
@@ -750,17 +920,17 @@ def parse_matches_from_html(html: str) -> List[Match]:
         )
 
         # --- Счёт и Bo ---
-        score_el = container.select_one(".match-info-header-scoreholder-scorewrapper")
+        score_el = _SEL_SCORE_WRAPPER.select_one(container)
         score: Optional[str] = None
         bo_text: Optional[str] = None
 
         if score_el:
-            upper = score_el.select_one(".match-info-header-scoreholder-upper")
-            lower = score_el.select_one(".match-info-header-scoreholder-lower")
+            upper = _SEL_SCORE_UPPER.select_one(score_el)
+            lower = _SEL_SCORE_LOWER.select_one(score_el)
 
             if upper:
                 raw_score_text = upper.get_text(strip=True)
-                m_sc = re.match(r"^(\d+)\s*[:\-]\s*(\d+)$", raw_score_text)
+                m_sc = _STRICT_SCORE_RE.match(raw_score_text)
                 if m_sc:
                     left = int(m_sc.group(1))
                     right = int(m_sc.group(2))
@@ -772,7 +942,9 @@ def parse_matches_from_html(html: str) -> List[Match]:
 
         need_fallback = score is None or score == "0:0" or bo_text is None
         if need_fallback:
-            fallback_score, fallback_bo = parse_score_and_bo_from_container(container)
+            if text_block is None:
+                text_block = " ".join(container.stripped_strings)
+            fallback_score, fallback_bo = parse_score_and_bo_from_container(container, text_block)
 
             if fallback_score and (score is None or score == "0:0"):
                 score = fallback_score
@@ -781,25 +953,14 @@ def parse_matches_from_html(html: str) -> List[Match]:
                 bo_text = fallback_bo
 
         # --- Турнир ---
-        tournament_el = container.select_one(".match-info-tournament a span")
+        tournament_el = _SEL_TOURNAMENT_NAME.select_one(container)
         tournament = tournament_el.get_text(strip=True) if tournament_el else None
 
         # --- Статус ---
-        # --- Статус ---
-        status: Optional[str] = None
-        status_el = container.select_one(".match-status")
+        status: Optional[str] = None  # <-- было "unknown"
+        status_el = _SEL_MATCH_STATUS.select_one(container)
         if status_el:
-            txt = status_el.get_text(strip=True).lower()
-            if "live" in txt:
-                status = "live"
-            elif "upcoming" in txt or "scheduled" in txt:
-                status = "upcoming"
-            elif "completed" in txt or "finished" in txt:
-                status = "finished"
-            else:
-                status = None  # <-- было "unknown"
-        else:
-            status = None  # <-- было None/unknown; фиксируем явно
+            status = _status_from_text(status_el.get_text(strip=True))
 
 
 
@@ -807,7 +968,7 @@ def parse_matches_from_html(html: str) -> List[Match]:
         match_url: Optional[str] = None
 
         # пытаемся вытащить Match:ID из кнопки матча
-        match_page_link = container.select_one(".match-page-button a")
+        match_page_link = _SEL_MATCH_PAGE_LINK.select_one(container)
         combined = ""
         if match_page_link:
             href = match_page_link.get("href") or ""
@@ -816,10 +977,11 @@ def parse_matches_from_html(html: str) -> List[Match]:
         has_redlink = "redlink=1" in combined
 
         # если в кнопке нет ID — пробуем вытащить из текста всего контейнера
-        m_id = re.search(r"Match:(ID_[^ \t&#/?]+)", combined)
+        m_id = _MATCH_ID_RE.search(combined)
         if not m_id:
-            text_block = " ".join(container.stripped_strings)
-            m_id = re.search(r"Match:(ID_[^ \t&#/?]+)", text_block)
+            if text_block is None:
+                text_block = " ".join(container.stripped_strings)
+            m_id = _MATCH_ID_RE.search(text_block)
 
         # если нашли ID — строим канонический URL
         if m_id and not has_redlink:
@@ -881,12 +1043,12 @@ def build_match_identifier(m: Match) -> str:
     url = m.match_url
 
     # Вариант 1: классический path: /Match:ID_...
-    m1 = re.search(r"Match:(ID_[^&#/?]+)", url)
+    m1 = _MATCH_URL_ID_RE.search(url)
     if m1:
         return m1.group(1)
 
     # Вариант 2: просто ID_... где-то в query
-    m2 = re.search(r"(ID_[A-Za-z0-9]+(?:_[0-9A-Za-z\-]+)?)", url)
+    m2 = _URL_QUERY_ID_RE.search(url)
     if m2:
         return m2.group(1)
 
@@ -941,9 +1103,17 @@ def deduplicate_matches(matches: List[Match]) -> List[Match]:
     def _norm_team(value: Optional[str]) -> str:
         return (value or "").strip().lower()
 
+    # турниров на странице единицы, а матчей — сотни: чистим и понижаем регистр
+    # каждого названия один раз, а не на каждом матче в обоих проходах
+    tournament_keys: dict[str, str] = {}
+
     def _tournament_key(value: Optional[str]) -> str:
-        cleaned = clean_tournament_name(value or "") or (value or "")
-        return cleaned.strip().lower()
+        raw = value or ""
+        key = tournament_keys.get(raw)
+        if key is None:
+            key = (clean_tournament_name(raw) or raw).strip().lower()
+            tournament_keys[raw] = key
+        return key
 
     real_matches_by_team: dict[tuple[str, str], list[datetime]] = {}
     for m in matches:
@@ -1094,7 +1264,7 @@ def _build_match_uid(m) -> str:
     # 2. Если liquipedia_match_id ещё нет, пытаемся вытащить его из match_url
     if not liqui_id:
         url = (getattr(m, "match_url", "") or "").strip()
-        m_url = re.search(r"Match:(ID_[^&#/?]+)", url)
+        m_url = _MATCH_URL_ID_RE.search(url)
         if m_url:
             liqui_id = m_url.group(1)
 
@@ -1122,10 +1292,87 @@ def _build_match_uid(m) -> str:
 
 
 
+# колонки апсерта, которые сравниваем с уже сохранённой строкой (кроме match_uid)
+_UPSERT_DIFF_COLUMNS = (
+    "match_time_msk",
+    "match_time_raw",
+    "team1",
+    "team2",
+    "score",
+    "bo",
+    "tournament",
+    "status",
+    "match_url",
+)
+
+
+def _upsert_changes_row(row: dict, existing: tuple) -> bool:
+    """
+    Изменит ли апсерт строку. Повторяет правила ON CONFLICT DO UPDATE:
+    NULL не перетирает старое значение, статус 'unknown' тоже.
+
+    Держать в синхроне с условием "что-то реально меняется" в UPDATE
+    из _save_matches_to_db_impl.
+    """
+    for col, old_value in zip(_UPSERT_DIFF_COLUMNS, existing):
+        new_value = row[col]
+        if new_value is None:
+            continue
+        if col == "status" and new_value == "unknown":
+            continue
+        if new_value != old_value:
+            return True
+    return False
+
+
+# счёт в том виде, в каком его принимает CASE в refresh_statuses_in_db:
+# score ~ '^[0-9]+:[0-9]+$' — без пробелов, без "-", без верхней границы
+_DB_SCORE_RE = re.compile(r"([0-9]+):([0-9]+)")
+
+
+def _initial_status(row: dict, now_msk: datetime) -> Optional[str]:
+    """
+    Статус для матча, которого ещё нет в БД, — Python-копия CASE из
+    refresh_statuses_in_db, чтобы новая строка сразу ложилась с правильным
+    статусом и не переписывалась отдельным UPDATE в том же проходе.
+    Меняете правила там — меняйте и здесь (tests/test_dota_status.py).
+    """
+    status = row["status"]
+    match_time = row["match_time_msk"]
+    if match_time is None:
+        return status
+
+    m = _DB_SCORE_RE.fullmatch(row["score"] or "")
+    score_tuple = (int(m.group(1)), int(m.group(2))) if m else None
+    bo = row["bo"]
+
+    # (bo / 2)::int в SQL — целочисленное деление с отбрасыванием к нулю
+    if score_tuple is not None and bo is not None and max(score_tuple) >= int(bo / 2) + 1:
+        return "finished"
+    if score_tuple is not None and match_time <= now_msk - timedelta(hours=24):
+        return "finished"
+    if match_time > now_msk + timedelta(minutes=5):
+        return "upcoming"
+    if (
+        now_msk - timedelta(hours=4) <= match_time <= now_msk - timedelta(minutes=5)
+        and status in (None, "unknown", "upcoming")
+    ):
+        return "live"
+    if match_time <= now_msk - timedelta(hours=12) and status == "live":
+        return "unknown"
+    return status
+
+
 def _save_matches_to_db_impl(matches: List[Match]) -> None:
     if not matches:
         return
 
+    upsert_rows: List[dict] = []
+    # id старой записи -> новый lp:UID; переписываем одним UPDATE после цикла
+    uid_migrations: Dict[int, str] = {}
+    new_count = 0
+    updated_count = 0
+
     with get_db_connection() as conn:
         with conn.cursor() as cur:
             for m in matches:
@@ -1145,6 +1392,7 @@ def _save_matches_to_db_impl(matches: List[Match]) -> None:
                         LIMIT 1;
                         """,
                         {"match_uid": new_uid},
+                        prepare=True,
                     )
                     row = cur.fetchone()
                     if row:
@@ -1164,6 +1412,7 @@ def _save_matches_to_db_impl(matches: List[Match]) -> None:
                                 LIMIT 1;
                                 """,
                                 {"match_url": m.match_url},
+                                prepare=True,
                             )
                             existing_row = cur.fetchone()
 
@@ -1197,6 +1446,7 @@ def _save_matches_to_db_impl(matches: List[Match]) -> None:
                                     "tournament_prefix": cleaned_tournament + "%",
                                     "match_time_msk": m.time_msk,
                                 },
+                                prepare=True,
                             )
                             existing_row = cur.fetchone()
 
@@ -1230,6 +1480,7 @@ def _save_matches_to_db_impl(matches: List[Match]) -> None:
                                         "tournament_prefix": cleaned_tournament + "%",
                                         "match_time_msk": m.time_msk,
                                     },
+                                    prepare=True,
                                 )
                                 existing_row = cur.fetchone()
                             elif m.team2 and not m.team1:
@@ -1252,21 +1503,14 @@ def _save_matches_to_db_impl(matches: List[Match]) -> None:
                                         "tournament_prefix": cleaned_tournament + "%",
                                         "match_time_msk": m.time_msk,
                                     },
+                                    prepare=True,
                                 )
                                 existing_row = cur.fetchone()
 
                         if existing_row:
                             old_id, old_uid = existing_row
-                            # мигрируем старый UID на новый
-                            cur.execute(
-                                """
-                                UPDATE dota_matches
-                                SET match_uid = %(new_uid)s,
-                                    updated_at = now()
-                                WHERE id = %(id)s;
-                                """,
-                                {"new_uid": new_uid, "id": old_id},
-                            )
+                            # мигрируем старый UID на новый (запись — пачкой после цикла)
+                            uid_migrations[old_id] = new_uid
                             match_uid = new_uid
                         else:
                             # это новый матч
@@ -1303,14 +1547,94 @@ def _save_matches_to_db_impl(matches: List[Match]) -> None:
                                 "tournament_prefix": cleaned_tournament + "%",
                                 "match_time_msk": m.time_msk,
                             },
+                            prepare=True,
                         )
                         row = cur.fetchone()
                         if row:
-                            existing_uid = row[1]
+                            # запись могла уже попасть в миграцию UID в этом же проходе
+                            existing_uid = uid_migrations.get(row[0], row[1])
 
                     match_uid = existing_uid or build_fallback_match_uid(m)
 
-                # Вставка / апдейт
+                # Вставка / апдейт — копим строки и отправляем одним executemany после цикла
+                upsert_rows.append(
+                    {
+                        "match_time_msk": m.time_msk,
+                        "match_time_raw": m.time_raw,
+                        "team1": m.team1,
+                        "team2": m.team2,
+                        "score": m.score,
+                        "bo": bo_int,
+                        "tournament": m.tournament,
+                        "status": m.status,
+                        "match_uid": match_uid,
+                        "match_url": m.match_url,
+                    },
+                )
+
+            if uid_migrations:
+                cur.execute(
+                    """
+                    UPDATE dota_matches AS d
+                    SET match_uid = v.new_uid,
+                        updated_at = now()
+                    FROM unnest(%(ids)s::bigint[], %(uids)s::text[]) AS v(id, new_uid)
+                    WHERE d.id = v.id;
+                    """,
+                    {"ids": list(uid_migrations), "uids": list(uid_migrations.values())},
+                )
+
+            # Одним SELECT'ом достаём уже сохранённые версии и отбрасываем матчи, которые
+            # апсерт всё равно бы не изменил: на них не тратим ни спекулятивную вставку,
+            # ни значение sequence.
+            if upsert_rows:
+                cur.execute(
+                    f"""
+                    SELECT match_uid, {", ".join(_UPSERT_DIFF_COLUMNS)}
+                    FROM dota_matches
+                    WHERE match_uid = ANY(%(uids)s);
+                    """,
+                    {"uids": [r["match_uid"] for r in upsert_rows]},
+                )
+                existing_by_uid = {row[0]: row[1:] for row in cur.fetchall()}
+
+                now_msk = datetime.now(MSK_TZ)
+                for r in upsert_rows:
+                    if r["match_uid"] not in existing_by_uid:
+                        r["status"] = _initial_status(r, now_msk)
+                upsert_rows = [
+                    r for r in upsert_rows
+                    if r["match_uid"] not in existing_by_uid
+                    or _upsert_changes_row(r, existing_by_uid[r["match_uid"]])
+                ]
+
+            # Оставшиеся (новые и изменённые) матчи заливаем COPY во временную таблицу и
+            # применяем двумя set-based запросами: вставка новых (anti-join) и UPDATE
+            # изменённых. Без ON CONFLICT DO UPDATE — нет спекулятивных вставок на каждую строку.
+            if upsert_rows:
+                cur.execute(
+                    """
+                    CREATE TEMP TABLE dota_matches_stage (
+                        match_time_msk TIMESTAMPTZ,
+                        match_time_raw TEXT,
+                        team1          TEXT,
+                        team2          TEXT,
+                        score          TEXT,
+                        bo             INTEGER,
+                        tournament     TEXT,
+                        status         TEXT,
+                        match_url      TEXT,
+                        match_uid      TEXT
+                    ) ON COMMIT DROP;
+                    """
+                )
+                stage_columns = _UPSERT_DIFF_COLUMNS + ("match_uid",)
+                with cur.copy(
+                    f"COPY dota_matches_stage ({', '.join(stage_columns)}) FROM STDIN"
+                ) as copy:
+                    for r in upsert_rows:
+                        copy.write_row(tuple(r[col] for col in stage_columns))
+
                 cur.execute(
                     """
                     INSERT INTO dota_matches (
@@ -1325,50 +1649,71 @@ def _save_matches_to_db_impl(matches: List[Match]) -> None:
                         match_uid,
                         match_url
                     )
-                    VALUES (
-                        %(match_time_msk)s,
-                        %(match_time_raw)s,
-                        %(team1)s,
-                        %(team2)s,
-                        %(score)s,
-                        %(bo)s,
-                        %(tournament)s,
-                        %(status)s,
-                        %(match_uid)s,
-                        %(match_url)s
+                    SELECT
+                        s.match_time_msk,
+                        s.match_time_raw,
+                        s.team1,
+                        s.team2,
+                        s.score,
+                        s.bo,
+                        s.tournament,
+                        s.status,
+                        s.match_uid,
+                        s.match_url
+                    FROM dota_matches_stage AS s
+                    WHERE NOT EXISTS (
+                        SELECT 1 FROM dota_matches AS d WHERE d.match_uid = s.match_uid
                     )
-                    ON CONFLICT (match_uid) DO UPDATE SET
-                        match_time_msk = COALESCE(EXCLUDED.match_time_msk, dota_matches.match_time_msk),
-                        score          = COALESCE(EXCLUDED.score, dota_matches.score),
-                        bo             = COALESCE(EXCLUDED.bo, dota_matches.bo),
-                        match_time_raw = COALESCE(EXCLUDED.match_time_raw, dota_matches.match_time_raw),
-                        team1          = COALESCE(EXCLUDED.team1, dota_matches.team1),
-                        team2          = COALESCE(EXCLUDED.team2, dota_matches.team2),
-                        tournament     = COALESCE(EXCLUDED.tournament, dota_matches.tournament),
+                    -- дубли match_uid внутри одной пачки: берём первую строку
+                    ON CONFLICT (match_uid) DO NOTHING;
+                    """
+                )
+                new_count = cur.rowcount
+
+                cur.execute(
+                    """
+                    UPDATE dota_matches AS d
+                    SET
+                        match_time_msk = COALESCE(s.match_time_msk, d.match_time_msk),
+                        score          = COALESCE(s.score, d.score),
+                        bo             = COALESCE(s.bo, d.bo),
+                        match_time_raw = COALESCE(s.match_time_raw, d.match_time_raw),
+                        team1          = COALESCE(s.team1, d.team1),
+                        team2          = COALESCE(s.team2, d.team2),
+                        tournament     = COALESCE(s.tournament, d.tournament),
                         status = CASE
-                            WHEN EXCLUDED.status IS NULL THEN dota_matches.status
-                            WHEN EXCLUDED.status = 'unknown' THEN dota_matches.status
-                            ELSE EXCLUDED.status
-                        END,                        match_url      = COALESCE(EXCLUDED.match_url, dota_matches.match_url),
-                        updated_at     = now();
-                                        """,
-                    {
-                        "match_time_msk": m.time_msk,
-                        "match_time_raw": m.time_raw,
-                        "team1": m.team1,
-                        "team2": m.team2,
-                        "score": m.score,
-                        "bo": bo_int,
-                        "tournament": m.tournament,
-                        "status": m.status,
-                        "match_uid": match_uid,
-                        "match_url": m.match_url,
-                    },
+                            WHEN s.status IS NULL THEN d.status
+                            WHEN s.status = 'unknown' THEN d.status
+                            ELSE s.status
+                        END,
+                        match_url      = COALESCE(s.match_url, d.match_url),
+                        updated_at     = now()
+                    FROM dota_matches_stage AS s
+                    WHERE d.match_uid = s.match_uid
+                      -- только если что-то реально меняется (в т.ч. не трогаем только что
+                      -- вставленные строки — они совпадают со stage).
+                      -- Держать в синхроне с _upsert_changes_row
+                      AND (
+                        (s.match_time_msk IS NOT NULL AND s.match_time_msk IS DISTINCT FROM d.match_time_msk)
+                        OR (s.score IS NOT NULL AND s.score IS DISTINCT FROM d.score)
+                        OR (s.bo IS NOT NULL AND s.bo IS DISTINCT FROM d.bo)
+                        OR (s.match_time_raw IS NOT NULL AND s.match_time_raw IS DISTINCT FROM d.match_time_raw)
+                        OR (s.team1 IS NOT NULL AND s.team1 IS DISTINCT FROM d.team1)
+                        OR (s.team2 IS NOT NULL AND s.team2 IS DISTINCT FROM d.team2)
+                        OR (s.tournament IS NOT NULL AND s.tournament IS DISTINCT FROM d.tournament)
+                        OR (s.status IS NOT NULL AND s.status <> 'unknown' AND s.status IS DISTINCT FROM d.status)
+                        OR (s.match_url IS NOT NULL AND s.match_url IS DISTINCT FROM d.match_url)
+                      );
+                    """
                 )
+                updated_count = cur.rowcount
 
             conn.commit()
 
-    print(f"Сохранили/обновили {len(matches)} матчей в БД")
+    print(
+        f"Сохранили матчей в БД: новых {new_count}, обновлено {updated_count}, "
+        f"без изменений {len(matches) - new_count - updated_count}"
+    )
 
 
 
@@ -1379,7 +1724,7 @@ def _save_matches_to_db_impl(matches: List[Match]) -> None:
 def extract_liquipedia_id_from_url(url: Optional[str]) -> Optional[str]:
     if not url:
         return None
-    m = re.search(r"Match:(ID_[^&#/?]+)", url)
+    m = _MATCH_URL_ID_RE.search(url)
     return m.group(1) if m else None
 
 
@@ -1396,18 +1741,18 @@ def fetch_score_from_completed_by_id(liqui_id: str) -> tuple[Optional[str], Opti
         log_event({"level": "error", "msg": "fetch_completed_failed", "error": str(e)})
         return None, None
 
-    soup = BeautifulSoup(html, "html.parser")
-    containers = soup.select(".match-info")
+    soup = BeautifulSoup(html, "lxml", parse_only=_MATCH_INFO_ONLY)
+    containers = _SEL_MATCH_INFO.select(soup)
     if not containers:
         return None, None
 
     for c in containers:
         # Пытаемся найти Match:ID_... где угодно внутри контейнера
         text_block = " ".join(c.stripped_strings)
-        m = re.search(r"Match:(ID_[^ \t&#/?]+)", text_block)
+        m = _MATCH_ID_RE.search(text_block)
         if not m:
             # иногда ID встречается в href/title
-            m = re.search(r"Match:(ID_[^ \t&#/?]+)", str(c))
+            m = _MATCH_ID_RE.search(str(c))
         if not m:
             continue
 
@@ -1418,14 +1763,14 @@ def fetch_score_from_completed_by_id(liqui_id: str) -> tuple[Optional[str], Opti
         # Нашли нужный матч — берём score/bo
         score, bo_text = None, None
 
-        score_el = c.select_one(".match-info-header-scoreholder-scorewrapper")
+        score_el = _SEL_SCORE_WRAPPER.select_one(c)
         if score_el:
-            upper = score_el.select_one(".match-info-header-scoreholder-upper")
-            lower = score_el.select_one(".match-info-header-scoreholder-lower")
+            upper = _SEL_SCORE_UPPER.select_one(score_el)
+            lower = _SEL_SCORE_LOWER.select_one(score_el)
 
             if upper:
                 raw = upper.get_text(strip=True)
-                mm = re.match(r"^(\d+)\s*[:\-]\s*(\d+)$", raw)
+                mm = _STRICT_SCORE_RE.match(raw)
                 if mm:
                     a, b = int(mm.group(1)), int(mm.group(2))
                     if 0 <= a <= 10 and 0 <= b <= 10:
@@ -1448,28 +1793,40 @@ def fetch_score_from_completed_by_id(liqui_id: str) -> tuple[Optional[str], Opti
 
 
 
-def _parse_score_block_from_soup(soup: BeautifulSoup) -> Tuple[Optional[str], Optional[str]]:
+def _lxml_text(el: lxml_html.HtmlElement) -> str:
+    """Аналог Tag.get_text(strip=True): склеиваем обрезанные текстовые узлы."""
+    return "".join(part.strip() for part in el.itertext())
+
+
+def _parse_score_block_from_tree(html: str | bytes) -> Tuple[Optional[str], Optional[str]]:
     """
-    Общая логика вытаскивания score + Bo из HTML блока матча.
-    Возвращает (score, bo_text).
+    Общая логика вытаскивания score + Bo из HTML страницы матча.
+    Возвращает (score, bo_text). Работаем напрямую с lxml-деревом: нужны два
+    элемента, а строить ради них дерево BeautifulSoup — основная CPU-стоимость шага.
     """
-    score_el = soup.select_one(".match-info-header-scoreholder-scorewrapper")
-    if not score_el:
+    try:
+        root = lxml_html.fromstring(html)
+    except (etree.ParserError, ValueError):
         return None, None
 
+    wrappers = root.find_class("match-info-header-scoreholder-scorewrapper")
+    if not wrappers:
+        return None, None
+    score_el = wrappers[0]
+
     score = None
     bo_text = None
 
-    upper = score_el.select_one(".match-info-header-scoreholder-upper")
-    lower = score_el.select_one(".match-info-header-scoreholder-lower")
+    upper = score_el.find_class("match-info-header-scoreholder-upper")
+    lower = score_el.find_class("match-info-header-scoreholder-lower")
 
     if upper:
-        parts = upper.get_text(strip=True).split(":")
+        parts = _lxml_text(upper[0]).split(":")
         if len(parts) == 2:
             score = f"{parts[0]}:{parts[1]}"
 
     if lower:
-        bo_text = lower.get_text(strip=True)
+        bo_text = _lxml_text(lower[0])
 
     return score, bo_text
 
@@ -1489,40 +1846,12 @@ def fetch_score_from_matches_by_id(liqui_id: str, url: str) -> tuple[Optional[st
         log_event({"level": "error", "msg": "fetch_matches_by_id_failed", "url": url, "error": str(e)})
         return None, None
 
-    soup = BeautifulSoup(html, "html.parser")
-    containers = soup.select(".match-info")
+    soup = BeautifulSoup(html, "lxml", parse_only=_MATCH_INFO_ONLY)
+    containers = _SEL_MATCH_INFO.select(soup)
     if not containers:
         logger.info("[SCORE_ID] no .match-info on %s", url)
         return None, None
 
-    ID_RE = re.compile(r"(ID_[A-Za-z0-9]+(?:_[0-9A-Za-z\-]+)*)")
-
-    def _extract_ids_from_container(c: Tag) -> list[str]:
-        ids: list[str] = []
-
-        # 1) смотрим кнопку матча
-        a_btn = c.select_one(".match-page-button a")
-        if a_btn:
-            combined = f"{a_btn.get('href','')} {a_btn.get('title','')}"
-            ids += ID_RE.findall(combined)
-
-        # 2) смотрим все ссылки внутри
-        for a in c.find_all("a", href=True):
-            combined = f"{a.get('href','')} {a.get('title','')}"
-            ids += ID_RE.findall(combined)
-
-        # 3) fallback по сырому html контейнера
-        ids += ID_RE.findall(str(c))
-
-        # уникализируем сохранив порядок
-        seen = set()
-        out = []
-        for x in ids:
-            if x not in seen:
-                seen.add(x)
-                out.append(x)
-        return out
-
     # строим индекс id -> container
     index: dict[str, Tag] = {}
     for c in containers:
@@ -1546,14 +1875,14 @@ def fetch_score_from_matches_by_id(liqui_id: str, url: str) -> tuple[Optional[st
     score: Optional[str] = None
     bo_text: Optional[str] = None
 
-    score_el = c.select_one(".match-info-header-scoreholder-scorewrapper")
+    score_el = _SEL_SCORE_WRAPPER.select_one(c)
     if score_el:
-        upper = score_el.select_one(".match-info-header-scoreholder-upper")
-        lower = score_el.select_one(".match-info-header-scoreholder-lower")
+        upper = _SEL_SCORE_UPPER.select_one(score_el)
+        lower = _SEL_SCORE_LOWER.select_one(score_el)
 
         if upper:
             raw = upper.get_text(strip=True)
-            mm = re.match(r"^(\d+)\s*[:\-]\s*(\d+)$", raw)
+            mm = _STRICT_SCORE_RE.match(raw)
             if mm:
                 a, b = int(mm.group(1)), int(mm.group(2))
                 if 0 <= a <= 10 and 0 <= b <= 10:
@@ -1577,14 +1906,14 @@ def _parse_score_from_container(container: Tag) -> tuple[Optional[str], Optional
     score: Optional[str] = None
     bo_text: Optional[str] = None
 
-    score_el = container.select_one(".match-info-header-scoreholder-scorewrapper")
+    score_el = _SEL_SCORE_WRAPPER.select_one(container)
     if score_el:
-        upper = score_el.select_one(".match-info-header-scoreholder-upper")
-        lower = score_el.select_one(".match-info-header-scoreholder-lower")
+        upper = _SEL_SCORE_UPPER.select_one(score_el)
+        lower = _SEL_SCORE_LOWER.select_one(score_el)
 
         if upper:
             raw = upper.get_text(strip=True)
-            mm = re.match(r"^(\d+)\s*[:\-]\s*(\d+)$", raw)
+            mm = _STRICT_SCORE_RE.match(raw)
             if mm:
                 a, b = int(mm.group(1)), int(mm.group(2))
                 if 0 <= a <= 10 and 0 <= b <= 10:
@@ -1604,19 +1933,19 @@ def _parse_score_from_container(container: Tag) -> tuple[Optional[str], Optional
 
 
 def _extract_ids_from_container(container: Tag) -> list[str]:
-    id_re = re.compile(r"(ID_[A-Za-z0-9]+(?:_[0-9A-Za-z\-]+)*)")
     ids: list[str] = []
 
-    a_btn = container.select_one(".match-page-button a")
+    a_btn = _SEL_MATCH_PAGE_LINK.select_one(container)
     if a_btn:
         combined = f"{a_btn.get('href','')} {a_btn.get('title','')}"
-        ids += id_re.findall(combined)
+        ids += _LIQUI_ID_RE.findall(combined)
 
     for a in container.find_all("a", href=True):
         combined = f"{a.get('href','')} {a.get('title','')}"
-        ids += id_re.findall(combined)
+        ids += _LIQUI_ID_RE.findall(combined)
 
-    ids += id_re.findall(str(container))
+    # ID бывают и вне <a> (data-атрибуты, текст) — сканируем весь контейнер всегда
+    ids += _LIQUI_ID_RE.findall(str(container))
 
     seen = set()
     out = []
@@ -1627,9 +1956,9 @@ def _extract_ids_from_container(container: Tag) -> list[str]:
     return out
 
 
-def _build_score_index(html: str) -> dict[str, tuple[Optional[str], Optional[str]]]:
-    soup = BeautifulSoup(html, "html.parser")
-    containers = soup.select(".match-info")
+def _build_score_index(html: str | bytes) -> dict[str, tuple[Optional[str], Optional[str]]]:
+    soup = BeautifulSoup(html, "lxml", parse_only=_MATCH_INFO_ONLY)
+    containers = _SEL_MATCH_INFO.select(soup)
     index: dict[str, tuple[Optional[str], Optional[str]]] = {}
 
     for c in containers:
@@ -1659,8 +1988,17 @@ def fetch_score_from_match_page(match_url: str) -> Tuple[Optional[str], Optional
     if not match_url:
         return None, None
 
+    cached = _MATCH_PAGE_CACHE.get(match_url)
+    headers: Dict[str, str] = {}
+    if cached:
+        etag, last_modified, _ = cached
+        if etag:
+            headers["If-None-Match"] = etag
+        if last_modified:
+            headers["If-Modified-Since"] = last_modified
+
     try:
-        html = fetch_html(match_url)
+        resp = _http_get(match_url, headers=headers or None)
     except requests .HTTPError as e:
         if getattr(e, "response", None) is not None and e.response.status_code == 404:
             # страницы матча не существует — это норма
@@ -1672,8 +2010,19 @@ def fetch_score_from_match_page(match_url: str) -> Tuple[Optional[str], Optional
         log_event({"level":"error","msg":"fetch_score_from_match_page_failed","match_url":match_url,"error":str(e)})
         return None, None
 
-    soup = BeautifulSoup(html, "html.parser")
-    return _parse_score_block_from_soup(soup)
+    if resp.status_code == 304 and cached:
+        return cached[2]
+
+    result = _parse_score_block_from_tree(resp.content)
+    etag = resp.headers.get("ETag")
+    last_modified = resp.headers.get("Last-Modified")
+    if etag or last_modified:
+        with _MATCH_PAGE_CACHE_LOCK:
+            if len(_MATCH_PAGE_CACHE) >= MATCH_PAGE_CACHE_MAX and match_url not in _MATCH_PAGE_CACHE:
+                # выкидываем самую старую запись (dict хранит порядок вставки)
+                _MATCH_PAGE_CACHE.pop(next(iter(_MATCH_PAGE_CACHE)), None)
+            _MATCH_PAGE_CACHE[match_url] = (etag, last_modified, result)
+    return result
 
 
 
@@ -1710,7 +2059,52 @@ def fetch_score_from_main_completed(team1: str, team2: str, tournament_clean: st
     return None
 
 
-def update_scores_from_match_pages() -> None:
+def _load_match_page_cache() -> None:
+    """Один раз за процесс подтягивает кэш страниц матчей с диска (битый файл — игнорируем)."""
+    global _MATCH_PAGE_CACHE_LOADED
+    if _MATCH_PAGE_CACHE_LOADED:
+        return
+    _MATCH_PAGE_CACHE_LOADED = True
+    try:
+        raw = json.loads(MATCH_PAGE_CACHE_FILE.read_text(encoding="utf-8"))
+        for url, (etag, last_modified, score, bo_text) in list(raw.items())[-MATCH_PAGE_CACHE_MAX:]:
+            _MATCH_PAGE_CACHE.setdefault(url, (etag, last_modified, (score, bo_text)))
+    except (OSError, ValueError, TypeError, AttributeError):
+        return
+
+
+def _save_match_page_cache() -> None:
+    data = {
+        url: [etag, last_modified, score, bo_text]
+        for url, (etag, last_modified, (score, bo_text)) in _MATCH_PAGE_CACHE.items()
+    }
+    try:
+        MATCH_PAGE_CACHE_FILE.write_text(json.dumps(data), encoding="utf-8")
+    except OSError as e:
+        logger.warning("Match page cache write failed: %s", e)
+
+
+def _fetch_match_page_scores(urls: List[str]) -> Dict[str, Tuple[Optional[str], Optional[str]]]:
+    """
+    Качает страницы матчей параллельно (сеть — основное время этого шага).
+    Возвращает {match_url: (score, bo_text)}; ошибки уже гасит fetch_score_from_match_page.
+    """
+    if not urls:
+        return {}
+    _load_match_page_cache()
+    workers = max(1, min(MATCH_PAGE_FETCH_WORKERS, len(urls)))
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        result = dict(zip(urls, pool.map(fetch_score_from_match_page, urls)))
+    _save_match_page_cache()
+    return result
+
+
+def update_scores_from_match_pages(live_html: Optional[bytes] = None) -> None:
+    """
+    Дообновляет счёт зависших live/upcoming матчей.
+    live_html — уже скачанная в этом проходе Liquipedia:Matches (из worker_once),
+    чтобы не качать её повторно; без него страница скачивается здесь.
+    """
     def _parse_score_tuple(score_str: str) -> Optional[tuple[int, int]]:
         try:
             a_str, b_str = score_str.strip().split(":")
@@ -1728,11 +2122,12 @@ def update_scores_from_match_pages() -> None:
         needed = bo_value // 2 + 1
         return max(a, b) >= needed
 
-    try:
-        live_html = fetch_html(MATCHES_URL)
-    except Exception as e:
-        log_event({"level": "error", "msg": "fetch_matches_failed", "error": str(e)})
-        return
+    if live_html is None:
+        try:
+            live_html = fetch_html(MATCHES_URL)
+        except Exception as e:
+            log_event({"level": "error", "msg": "fetch_matches_failed", "error": str(e)})
+            return
 
     completed_html = None
     try:
@@ -1759,98 +2154,135 @@ def update_scores_from_match_pages() -> None:
                     (status = 'live' OR status = 'upcoming' OR status = 'unknown' OR status IS NULL)
                     AND match_time_msk IS NOT NULL
                     AND match_time_msk < (now() AT TIME ZONE 'Europe/Moscow') - INTERVAL '10 minutes'
-                ORDER BY match_time_msk
+                    -- старше недели счёт уже не появится, а без id/url его негде искать:
+                    -- такие строки иначе занимают начало LIMIT каждый проход
+                    AND match_time_msk > (now() AT TIME ZONE 'Europe/Moscow') - INTERVAL '7 days'
+                    AND (liquipedia_match_id IS NOT NULL OR match_url IS NOT NULL)
+                -- сначала те, кого дольше всех не проверяли: если кандидатов больше LIMIT,
+                -- проходы идут по ним по кругу, а не перечитывают каждый раз одну и ту же голову
+                ORDER BY last_score_check_at NULLS FIRST, match_time_msk
                 LIMIT 200;
                 """
             )
 
             rows = cur.fetchall()
-            if not rows:
-                print("[SCORE] Нет матчей, требующих обновления счёта")
-                return
 
-            print(f"[SCORE] Обновляем счёт для {len(rows)} матчей")
+    # SELECT закрыт до скачивания страниц: иначе единственное соединение пула
+    # висело бы idle in transaction, пока качаются до 200 страниц матчей
+    if not rows:
+        print("[SCORE] Нет матчей, требующих обновления счёта")
+        return
 
-            for (match_id, match_url, liqui_id_db, score_db, status_db, bo_db) in rows:
-                # если уже финальный — пропускаем
-                if score_db and bo_db and _is_final_score(score_db, bo_db):
-                    continue
+    print(f"[SCORE] Обновляем счёт для {len(rows)} матчей")
 
-                match_url = sanitize_match_url(match_url)
-                liqui_id = (liqui_id_db or "").strip() or extract_liquipedia_id_from_url(match_url)
-                if not liqui_id:
-                    cur.execute(
-                        "UPDATE dota_matches SET last_score_check_at = now() WHERE id = %(id)s;",
-                        {"id": match_id},
-                    )
-                    continue
+    # (match_id, url страницы матча или None, bo из БД, счёт, bo) — после индексов
+    pending: List[Tuple[int, Optional[str], Optional[int], Optional[str], Optional[int]]] = []
+    # id матчей, где счёт не нашли (только отметка проверки), и найденные (id, score, bo, status)
+    checked_ids: List[int] = []
+    score_updates: List[Tuple[int, str, Optional[int], str]] = []
 
-                logger.info("[SCORE_ID] try match_id=%s liqui_id=%s", match_id, liqui_id)
-
-                new_score: Optional[str] = None
-                new_bo: Optional[int] = None
-
-                # 1) matches (live/finished) from prebuilt index
-                s, bo_text = live_index.get(liqui_id, (None, None))
-                if s:
-                    new_score = s
-                if bo_text:
-                    new_bo = parse_bo_int(bo_text)
-
-                # 2) completed from prebuilt index
-                s2, bo_text2 = completed_index.get(liqui_id, (None, None))
-                if not new_score and s2:
-                    new_score = s2
-                if bo_text2 and new_bo is None:
-                    new_bo = parse_bo_int(bo_text2)
-
-                # 3) match page (optional)
-                if not new_score and match_url:
-                    s, bo_text = fetch_score_from_match_page(match_url)
-                    if s:
-                        new_score = s
-                    if bo_text and new_bo is None:
-                        new_bo = parse_bo_int(bo_text)
-
-                if not new_score:
-                    cur.execute(
-                        "UPDATE dota_matches SET last_score_check_at = now() WHERE id = %(id)s;",
-                        {"id": match_id},
-                    )
-                    continue
+    for (match_id, match_url, liqui_id_db, score_db, status_db, bo_db) in rows:
+        # если уже финальный — пропускаем
+        if score_db and bo_db and _is_final_score(score_db, bo_db):
+            continue
 
-                bo_effective = new_bo if new_bo is not None else bo_db
-                is_final = _is_final_score(new_score, bo_effective)
-                new_status = "finished" if is_final else "live"
+        match_url = sanitize_match_url(match_url)
+        liqui_id = (liqui_id_db or "").strip() or extract_liquipedia_id_from_url(match_url)
+        if not liqui_id:
+            checked_ids.append(match_id)
+            continue
+
+        logger.debug("[SCORE_ID] try match_id=%s liqui_id=%s", match_id, liqui_id)
+
+        new_score: Optional[str] = None
+        new_bo: Optional[int] = None
+
+        # 1) matches (live/finished) from prebuilt index
+        s, bo_text = live_index.get(liqui_id, (None, None))
+        if s:
+            new_score = s
+        if bo_text:
+            new_bo = parse_bo_int(bo_text)
+
+        # 2) completed from prebuilt index
+        s2, bo_text2 = completed_index.get(liqui_id, (None, None))
+        if not new_score and s2:
+            new_score = s2
+        if bo_text2 and new_bo is None:
+            new_bo = parse_bo_int(bo_text2)
+
+        # 3) match page (optional). Если матч есть на Liquipedia:Matches, но без счёта,
+        # он ещё не начался — страница матча ничего нового не даст, не тратим запрос.
+        # Сами страницы качаем позже, все разом и параллельно.
+        listed_without_score = liqui_id in live_index and not live_index[liqui_id][0]
+        page_url = match_url if (not new_score and match_url and not listed_without_score) else None
+        pending.append((match_id, page_url, bo_db, new_score, new_bo))
+
+    page_scores = _fetch_match_page_scores(
+        list(dict.fromkeys(p[1] for p in pending if p[1]))
+    )
+
+    for (match_id, page_url, bo_db, new_score, new_bo) in pending:
+        if page_url:
+            s, bo_text = page_scores.get(page_url, (None, None))
+            if s:
+                new_score = s
+            if bo_text and new_bo is None:
+                new_bo = parse_bo_int(bo_text)
 
+        if not new_score:
+            checked_ids.append(match_id)
+            continue
+
+        bo_effective = new_bo if new_bo is not None else bo_db
+        is_final = _is_final_score(new_score, bo_effective)
+        new_status = "finished" if is_final else "live"
+        score_updates.append((match_id, new_score, new_bo, new_status))
+
+    # Все изменения — двумя set-based UPDATE вместо отдельного запроса на каждый матч
+    if not checked_ids and not score_updates:
+        return
+
+    with get_db_connection() as conn:
+        with conn.cursor() as cur:
+            if checked_ids:
+                cur.execute(
+                    "UPDATE dota_matches SET last_score_check_at = now() WHERE id = ANY(%(ids)s);",
+                    {"ids": checked_ids},
+                )
+
+            if score_updates:
+                ids, scores, bos, statuses = (list(col) for col in zip(*score_updates))
                 cur.execute(
                     """
-                    UPDATE dota_matches
+                    UPDATE dota_matches AS d
                     SET
-                        score = %(score)s,
-                        bo = COALESCE(%(bo)s, bo),
-                        status = %(status)s,
+                        score = v.score,
+                        bo = COALESCE(v.bo, d.bo),
+                        status = v.status,
                         last_score_check_at = now(),
                         score_last_updated_at = now(),
                         updated_at = now()
-                    WHERE id = %(id)s;
+                    FROM unnest(
+                        %(ids)s::bigint[], %(scores)s::text[], %(bos)s::int[], %(statuses)s::text[]
+                    ) AS v(id, score, bo, status)
+                    WHERE d.id = v.id;
                     """,
-                    {"id": match_id, "score": new_score, "bo": new_bo, "status": new_status},
+                    {"ids": ids, "scores": scores, "bos": bos, "statuses": statuses},
                 )
-
                 logger.info(
-                    "[SCORE_DB] updated id=%s rowcount=%s score=%s bo=%s status=%s",
-                    match_id, cur.rowcount, new_score, new_bo, new_status
+                    "[SCORE_DB] updated rows=%s of %s: %s",
+                    cur.rowcount, len(score_updates), score_updates,
                 )
 
             conn.commit()
 
 
-def update_scores_with_retry(max_retries: int = 3) -> None:
+def update_scores_with_retry(max_retries: int = 3, live_html: Optional[bytes] = None) -> None:
     attempt = 1
     while True:
         try:
-            update_scores_from_match_pages()
+            update_scores_from_match_pages(live_html)
             return
         except errors.DeadlockDetected as e:
             logger.warning(
@@ -1880,50 +2312,62 @@ def refresh_statuses_in_db() -> None:
         with conn.cursor() as cur:
             cur.execute(
                 """
-                UPDATE dota_matches
+                UPDATE dota_matches AS d
                 SET
-                    status = CASE
-                        -- 1) финализация по bo+score
-                        WHEN bo IS NOT NULL
-                             AND score IS NOT NULL AND score <> ''
-                             AND score ~ '^[0-9]+:[0-9]+$'
-                             AND GREATEST(
-                                 split_part(score, ':', 1)::int,
-                                 split_part(score, ':', 2)::int
-                             ) >= ((bo / 2)::int + 1)
-                        THEN 'finished'
-
-                        -- 1б) матч старше 24 часов и есть счёт -> считаем завершённым
-                        WHEN match_time_msk <= now() - INTERVAL '24 hours'
-                             AND score IS NOT NULL AND score <> ''
-                             AND score ~ '^[0-9]+:[0-9]+$'
-                        THEN 'finished'
-
-                        -- 2) ещё не начался
-                        WHEN match_time_msk > now() + INTERVAL '5 minutes'
-                        THEN 'upcoming'
-
-                        -- 3) должен идти (в пределах 4 часов)
-                        WHEN match_time_msk <= now() - INTERVAL '5 minutes'
-                             AND match_time_msk >= now() - INTERVAL '4 hours'
-                             AND (status IS NULL OR status IN ('unknown', 'upcoming'))
-                        THEN 'live'
-
-                        -- 4) слишком старый live без финального счёта -> unknown
-                        WHEN match_time_msk <= now() - INTERVAL '12 hours'
-                             AND status = 'live'
-                        THEN 'unknown'
-
-                        -- иначе не трогаем
-                        ELSE status
-                    END,
+                    status = s.new_status,
                     updated_at = now()
-                WHERE match_time_msk IS NOT NULL;
+                FROM (
+                    SELECT
+                        id,
+                        -- Python-копия этих правил: _initial_status() (статус новой строки при вставке).
+                        -- Меняете CASE — меняйте и её, tests/test_dota_status.py сверяет ветки.
+                        CASE
+                            -- 1) финализация по bo+score
+                            WHEN bo IS NOT NULL
+                                 AND score IS NOT NULL AND score <> ''
+                                 AND score ~ '^[0-9]+:[0-9]+$'
+                                 AND GREATEST(
+                                     split_part(score, ':', 1)::int,
+                                     split_part(score, ':', 2)::int
+                                 ) >= ((bo / 2)::int + 1)
+                            THEN 'finished'
+
+                            -- 1б) матч старше 24 часов и есть счёт -> считаем завершённым
+                            WHEN match_time_msk <= now() - INTERVAL '24 hours'
+                                 AND score IS NOT NULL AND score <> ''
+                                 AND score ~ '^[0-9]+:[0-9]+$'
+                            THEN 'finished'
+
+                            -- 2) ещё не начался
+                            WHEN match_time_msk > now() + INTERVAL '5 minutes'
+                            THEN 'upcoming'
+
+                            -- 3) должен идти (в пределах 4 часов)
+                            WHEN match_time_msk <= now() - INTERVAL '5 minutes'
+                                 AND match_time_msk >= now() - INTERVAL '4 hours'
+                                 AND (status IS NULL OR status IN ('unknown', 'upcoming'))
+                            THEN 'live'
+
+                            -- 4) слишком старый live без финального счёта -> unknown
+                            WHEN match_time_msk <= now() - INTERVAL '12 hours'
+                                 AND status = 'live'
+                            THEN 'unknown'
+
+                            -- иначе не трогаем
+                            ELSE status
+                        END AS new_status
+                    FROM dota_matches
+                    WHERE match_time_msk IS NOT NULL
+                ) AS s
+                WHERE d.id = s.id
+                  -- переписываем только строки, где статус реально меняется
+                  AND d.status IS DISTINCT FROM s.new_status;
                 """
             )
+            changed = cur.rowcount
         conn.commit()
 
-    print("Статусы матчей обновлены по времени/BO")
+    print(f"Статусы матчей обновлены по времени/BO: изменено {changed}")
 
 
 
@@ -1982,7 +2426,7 @@ def worker_once() -> None:
 
         # 5. добиваем счёт
         if os.getenv("SKIP_SCORE_UPDATE", "").lower() not in {"1", "true", "yes"}:
-            update_scores_with_retry()
+            update_scores_with_retry(live_html=html)
 
         # 6. статусы
         refresh_statuses_in_db()
@@ -22,6 +22,7 @@ DB: async psycopg3 + AsyncConnectionPool
 from __future__ import annotations
 
 import asyncio
+import json
 import logging
 import os
 import re
@@ -33,9 +34,11 @@ from urllib.parse import urljoin, urlparse
 from dotenv import load_dotenv
 
 import requests
-from bs4 import BeautifulSoup
+from lxml import etree, html as lxml_html
 from psycopg_pool import AsyncConnectionPool
 
+from cybermatches.common.text import slug_from_liquipedia_url
+
 
 # --------------------------
 # ENV
@@ -100,6 +103,11 @@ HEADERS = {
 
 HTTP_TIMEOUT = float(os.getenv("HTTP_TIMEOUT", "30"))
 
+# копия последнего ответа портала + его ETag/Last-Modified (для условного GET)
+HTML_CACHE_DIR = Path(os.getenv("TEAMS_CACHE_DIR", str(Path(__file__).resolve().parents[2] / "logs")))
+HTML_CACHE_BODY = HTML_CACHE_DIR / "teams_cache.html"
+HTML_CACHE_META = HTML_CACHE_DIR / "teams_cache.meta"
+
 DB_HOST = os.getenv("DB_HOST", "localhost")
 DB_PORT = int(os.getenv("DB_PORT", "5432"))
 DB_NAME = os.getenv("DB_NAME", "postgres")
@@ -110,44 +118,80 @@ DB_CONNECT_TIMEOUT_SEC = int(os.getenv("DB_CONNECT_TIMEOUT_SEC", "10"))
 DB_LOCK_TIMEOUT_MS = int(os.getenv("DB_LOCK_TIMEOUT_MS", "5000"))
 DB_STATEMENT_TIMEOUT_MS = int(os.getenv("DB_STATEMENT_TIMEOUT_MS", "30000"))
 
-INSERT_CHUNK_SIZE = int(os.getenv("INSERT_CHUNK_SIZE", "200"))
-
 CONNINFO = (
     f"host={DB_HOST} port={DB_PORT} dbname={DB_NAME} user={DB_USER} password={DB_PASSWORD} "
-    f"connect_timeout={DB_CONNECT_TIMEOUT_SEC} application_name=teams_parser"
+    f"connect_timeout={DB_CONNECT_TIMEOUT_SEC} application_name=teams_parser "
+    # таймауты задаём при открытии соединения, а не отдельными SET перед каждой вставкой
+    f"options='-c lock_timeout={DB_LOCK_TIMEOUT_MS} -c statement_timeout={DB_STATEMENT_TIMEOUT_MS}'"
 )
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class TeamRow:
     liquipedia_slug: str
     liquipedia_url: str
     name: str
 
 
+_WS_RE = re.compile(r"\s+")
+
+
 def normalize_text(s: str) -> str:
-    return re.sub(r"\s+", " ", (s or "")).strip()
+    return _WS_RE.sub(" ", (s or "")).strip()
 
 
-def fetch_html(url: str) -> str:
+def _load_html_cache(url: str) -> tuple[dict, bytes | None]:
+    """(meta, html) прошлого ответа для url или ({}, None), если кэша нет/он битый."""
+    try:
+        meta = json.loads(HTML_CACHE_META.read_text(encoding="utf-8"))
+        if meta.get("url") != url:
+            return {}, None
+        return meta, HTML_CACHE_BODY.read_bytes()
+    except (OSError, ValueError):
+        return {}, None
+
+
+def _save_html_cache(url: str, resp: requests.Response) -> None:
+    meta = {
+        "url": url,
+        "etag": resp.headers.get("ETag"),
+        "last_modified": resp.headers.get("Last-Modified"),
+    }
+    if not meta["etag"] and not meta["last_modified"]:
+        return
+    try:
+        HTML_CACHE_BODY.write_bytes(resp.content)
+        HTML_CACHE_META.write_text(json.dumps(meta), encoding="utf-8")
+    except OSError as e:
+        logger.warning("HTML cache write failed: %s", e)
+
+
+def fetch_html(url: str) -> bytes:
+    """
+    GET с условными заголовками: портал меняется редко, поэтому при 304
+    отдаём копию с диска и не качаем страницу целиком.
+    """
+    meta, cached_html = _load_html_cache(url)
+    headers = dict(HEADERS)
+    if cached_html is not None:
+        if meta.get("etag"):
+            headers["If-None-Match"] = meta["etag"]
+        if meta.get("last_modified"):
+            headers["If-Modified-Since"] = meta["last_modified"]
+
     t0 = time.monotonic()
     logger.info("HTTP GET: %s", url)
-    resp = requests.get(url, headers=HEADERS, timeout=HTTP_TIMEOUT)
+    resp = requests.get(url, headers=headers, timeout=HTTP_TIMEOUT)
     ms = int((time.monotonic() - t0) * 1000)
     logger.info("HTTP %s (%d ms), bytes=%s", resp.status_code, ms, resp.headers.get("Content-Length", "unknown"))
+    if resp.status_code == 304 and cached_html is not None:
+        logger.info("Not modified, using cached HTML: %s", HTML_CACHE_BODY)
+        return cached_html
     resp.raise_for_status()
-    return resp.text
-
-
-def slug_from_liquipedia_url(full_url: str) -> str:
-    path = urlparse(full_url).path
-    parts = [p for p in path.split("/") if p]
-    if len(parts) >= 2:
-        return parts[-1]
-    return path.lstrip("/")
-
+    _save_html_cache(url, resp)
+    # Сырые байты: lxml сам определит кодировку по <meta charset>, без лишней копии в str.
+    return resp.content
 
-from urllib.parse import urlparse
 
 def canonical_liquipedia_path(value: str) -> str:
     """
@@ -172,15 +216,32 @@ def canonical_liquipedia_path(value: str) -> str:
     return v
 
 
-def parse_teams_from_portal(html: str) -> list[TeamRow]:
+def _first_team_link(span: lxml_html.HtmlElement) -> lxml_html.HtmlElement | None:
+    """Аналог span.select_one("span.team-template-text a[href]")."""
+    for inner in span.find_class("team-template-text"):
+        if inner.tag != "span":
+            continue
+        for a in inner.iter("a"):
+            if a.get("href") is not None:
+                return a
+    return None
+
+
+def parse_teams_from_portal(html: str | bytes) -> list[TeamRow]:
     """
     Берём команды через team-template, как в старой версии:
     span.team-template-team-standard -> span.team-template-text a
     """
     t0 = time.monotonic()
-    soup = BeautifulSoup(html, "lxml")
+    # Прямо по lxml-дереву: нужны только span'ы team-template, дерево BeautifulSoup
+    # на весь портал — основная CPU-стоимость разбора.
+    try:
+        root = lxml_html.fromstring(html)
+    except (etree.ParserError, ValueError):
+        logger.warning("Portal parse: empty or broken HTML")
+        return []
 
-    spans = soup.select("span.team-template-team-standard")
+    spans = [el for el in root.find_class("team-template-team-standard") if el.tag == "span"]
     found_links = 0
     redlinks = 0
     empty = 0
@@ -188,12 +249,12 @@ def parse_teams_from_portal(html: str) -> list[TeamRow]:
     teams_by_slug: dict[str, TeamRow] = {}
 
     for span in spans:
-        a = span.select_one("span.team-template-text a[href]")
-        if not a:
+        a = _first_team_link(span)
+        if a is None:
             continue
 
         href = normalize_text(a.get("href", ""))
-        name = normalize_text(a.get_text())
+        name = normalize_text(a.text_content())
 
         if not href or not name:
             empty += 1
@@ -206,7 +267,10 @@ def parse_teams_from_portal(html: str) -> list[TeamRow]:
             continue
 
         href = href.split("#", 1)[0]
-        full_url = urljoin(LIQUIPEDIA_BASE, href)
+        if href.startswith("/") and not href.startswith("//"):
+            full_url = LIQUIPEDIA_BASE + href
+        else:
+            full_url = urljoin(LIQUIPEDIA_BASE, href)
         slug = slug_from_liquipedia_url(full_url)
 
         if ":" in slug:
@@ -254,16 +318,18 @@ async def ensure_schema(pool: AsyncConnectionPool) -> None:
     logger.info("Schema ensured: public.dota_teams (time=%d ms)", int((time.monotonic() - t0) * 1000))
 
 
-def chunked(seq: list[TeamRow], size: int):
-    for i in range(0, len(seq), size):
-        yield seq[i : i + size]
-
-
 async def count_teams(pool: AsyncConnectionPool) -> int:
+    """
+    Оценка числа команд из статистики pg_class (без seq scan) — для лога этого хватает.
+    Точный COUNT(*) только если таблицу ещё ни разу не анализировали (reltuples = -1).
+    """
     async with pool.connection() as conn:
         async with conn.cursor() as cur:
-            await cur.execute("SELECT COUNT(*) FROM public.dota_teams;")
+            await cur.execute("SELECT reltuples::bigint FROM pg_class WHERE oid = 'public.dota_teams'::regclass;")
             (cnt,) = await cur.fetchone()
+            if cnt < 0:
+                await cur.execute("SELECT COUNT(*) FROM public.dota_teams;")
+                (cnt,) = await cur.fetchone()
             return int(cnt)
 
 
@@ -277,43 +343,59 @@ async def insert_new_teams(pool: AsyncConnectionPool, teams: list[TeamRow]) -> i
         logger.warning("No teams to insert (empty list).")
         return 0
 
-    sql = """
-    INSERT INTO public.dota_teams (liquipedia_slug, liquipedia_url, name, created_at, updated_at)
-    VALUES (%s, %s, %s, now(), now())
-    ON CONFLICT (liquipedia_slug) DO NOTHING;
-    """
-
-    total_inserted = 0
+    inserted = 0
     t0 = time.monotonic()
 
     async with pool.connection() as conn:
         async with conn.cursor() as cur:
-            await cur.execute(f"SET lock_timeout = '{DB_LOCK_TIMEOUT_MS}ms';")
-            await cur.execute(f"SET statement_timeout = '{DB_STATEMENT_TIMEOUT_MS}ms';")
-
-            for part_no, part in enumerate(chunked(teams, INSERT_CHUNK_SIZE), start=1):
-                params = [(t.liquipedia_slug, t.liquipedia_url, t.name) for t in part]
-
-                logger.info("Insert chunk %d: start rows=%d", part_no, len(params))
-                part_t0 = time.monotonic()
-
-                await cur.executemany(sql, params)
-
-                inserted = cur.rowcount or 0  # сколько реально вставилось в этом executemany
-                total_inserted += inserted
-
-                logger.info(
-                    "Insert chunk %d: done attempted=%d inserted=%d time=%d ms",
-                    part_no,
-                    len(params),
-                    inserted,
-                    int((time.monotonic() - part_t0) * 1000),
+            # В обычном прогоне почти все команды уже в БД: отсекаем их одним SELECT'ом,
+            # чтобы не гонять лишние строки через COPY и ON CONFLICT.
+            await cur.execute(
+                "SELECT liquipedia_slug FROM public.dota_teams WHERE liquipedia_slug = ANY(%s);",
+                ([t.liquipedia_slug for t in teams],),
+            )
+            existing = {row[0] for row in await cur.fetchall()}
+            new_teams = [t for t in teams if t.liquipedia_slug not in existing]
+
+            if new_teams:
+                # Новые — одним COPY во временную таблицу и одним INSERT ... SELECT,
+                # вместо построчных INSERT'ов пачками.
+                await cur.execute(
+                    """
+                    CREATE TEMP TABLE dota_teams_stage (
+                        liquipedia_slug TEXT,
+                        liquipedia_url  TEXT,
+                        name            TEXT
+                    ) ON COMMIT DROP;
+                    """
+                )
+                async with cur.copy(
+                    "COPY dota_teams_stage (liquipedia_slug, liquipedia_url, name) FROM STDIN"
+                ) as copy:
+                    for t in new_teams:
+                        await copy.write_row((t.liquipedia_slug, t.liquipedia_url, t.name))
+
+                await cur.execute(
+                    """
+                    INSERT INTO public.dota_teams (liquipedia_slug, liquipedia_url, name, created_at, updated_at)
+                    SELECT liquipedia_slug, liquipedia_url, name, now(), now()
+                    FROM dota_teams_stage
+                    ON CONFLICT (liquipedia_slug) DO NOTHING;
+                    """
                 )
+                inserted = cur.rowcount or 0
 
         await conn.commit()
 
-    logger.info("Insert complete: inserted=%d, time=%d ms", total_inserted, int((time.monotonic() - t0) * 1000))
-    return total_inserted
+    logger.info(
+        "Insert complete: parsed=%d already_in_db=%d attempted=%d inserted=%d, time=%d ms",
+        len(teams),
+        len(existing),
+        len(new_teams),
+        inserted,
+        int((time.monotonic() - t0) * 1000),
+    )
+    return inserted
 
 
 async def main() -> None:
@@ -329,24 +411,39 @@ async def main() -> None:
         DB_STATEMENT_TIMEOUT_MS,
     )
 
-    html = fetch_html(PORTAL_TEAMS_URL)
-    teams = parse_teams_from_portal(html)
-
     pool = AsyncConnectionPool(CONNINFO, min_size=1, max_size=5, open=False)
-    await pool.open()
-    try:
+
+    async def open_pool_and_schema() -> None:
+        await pool.open()
         await ensure_schema(pool)
 
-        before = await count_teams(pool)
+    try:
+        # HTTP-запрос к порталу (в отдельном потоке) идёт параллельно с подъёмом пула и DDL
+        schema_task = asyncio.create_task(open_pool_and_schema())
+        try:
+            html = await asyncio.to_thread(fetch_html, PORTAL_TEAMS_URL)
+        except BaseException:
+            # пул закрываем только после того, как DDL-задача действительно остановилась
+            schema_task.cancel()
+            try:
+                await schema_task
+            except BaseException:
+                pass
+            raise
+        await schema_task
+        teams = parse_teams_from_portal(html)
+
+        # оценка по pg_class.reltuples (см. count_teams), не точный счёт
+        before_est = await count_teams(pool)
         inserted = await insert_new_teams(pool, teams)
-        after = await count_teams(pool)
+        after_est = before_est + inserted
 
         logger.info(
-            "Teams sync done: parsed=%d, inserted_new=%d, db_before=%d, db_after=%d, total_time=%d ms",
+            "Teams sync done: parsed=%d, inserted_new=%d, db_before_est=%d, db_after_est=%d, total_time=%d ms",
             len(teams),
             inserted,
-            before,
-            after,
+            before_est,
+            after_est,
             int((time.monotonic() - run_t0) * 1000),
         )
     finally:
@@ -0,0 +1,18 @@
+-- Migration 007: Partial index for the score-update scan
+-- Purpose: update_scores_from_match_pages() каждый проход выбирает незавершённые матчи
+-- (live/upcoming/unknown/NULL) за последнюю неделю, уже начавшиеся, у которых есть
+-- liquipedia_match_id или match_url, ORDER BY last_score_check_at NULLS FIRST,
+-- match_time_msk LIMIT 200.
+-- idx_dota_matches_status_time (001) покрывает только live/upcoming, поэтому
+-- запрос с unknown/NULL шёл seq scan по всей таблице. Условие индекса повторяет
+-- статусную часть WHERE запроса, чтобы планировщик гарантированно его взял;
+-- finished-матчи (основная масса таблицы) в индекс не попадают.
+-- Окно по match_time_msk (now() - 7 days .. now() - 10 minutes) становится Index Cond
+-- по этому индексу; фильтр по id/url и top-N sort по last_score_check_at идут уже
+-- по строкам одной недели незавершённых матчей, т.е. по сотням строк, а не по таблице.
+-- При изменении WHERE/ORDER BY запроса сверяйте план с этим индексом.
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_dota_matches_pending_score
+ON dota_matches (match_time_msk)
+WHERE (status = 'live' OR status = 'upcoming' OR status = 'unknown' OR status IS NULL)
+  AND match_time_msk IS NOT NULL;
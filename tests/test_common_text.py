@@ -5,6 +5,7 @@ from cybermatches.common.text import (
     is_placeholder_team,
     parse_bo_int,
     parse_score_tuple,
+    slug_from_liquipedia_url,
     strip_page_does_not_exist,
 )
 
@@ -12,6 +13,8 @@ from cybermatches.common.text import (
 def test_strip_page_does_not_exist():
     assert strip_page_does_not_exist("Team A (page does not exist)") == "Team A"
     assert strip_page_does_not_exist("Team B") == "Team B"
+    assert strip_page_does_not_exist("  Team C (page does not exist)\n") == "Team C"
+    assert strip_page_does_not_exist("Team (D) ") == "Team (D)"
 
 
 def test_extract_team_name_from_tag_prefers_title():
@@ -39,3 +42,15 @@ def test_is_placeholder_team():
     assert is_placeholder_team("TBD") is True
     assert is_placeholder_team("to be decided") is True
     assert is_placeholder_team("Team Liquid") is False
+
+
+def test_slug_from_liquipedia_url():
+    assert slug_from_liquipedia_url("https://liquipedia.net/dota2/Team_Liquid") == "Team_Liquid"
+    assert slug_from_liquipedia_url("https://liquipedia.net/dota2/Team_Liquid/") == "Team_Liquid"
+    assert slug_from_liquipedia_url("https://liquipedia.net/dota2/Team_Liquid?x=1#top") == "Team_Liquid"
+    assert slug_from_liquipedia_url("https://liquipedia.net/dota2/Team#a?b") == "Team"
+    assert slug_from_liquipedia_url("https://liquipedia.net/dota2/Team;x") == "Team"
+    assert slug_from_liquipedia_url("https://liquipedia.net/dota2;x/Team") == "Team"
+    assert slug_from_liquipedia_url("https://liquipedia.net/Team") == "Team"
+    assert slug_from_liquipedia_url("https://liquipedia.net/") == ""
+    assert slug_from_liquipedia_url("/dota2/Team") == "Team"
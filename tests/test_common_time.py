@@ -32,3 +32,15 @@ def test_parse_time_to_target_tz():
     assert dt is not None
     assert dt.hour == 15
     assert dt.minute == 40
+
+
+def test_parse_liquipedia_time_single_digit_day_and_bad_input():
+    target_tz = ZoneInfo("Europe/Moscow")
+    dt_utc, dt_msk = parse_liquipedia_time("March 1, 2026 - 09:05UTC", target_tz)
+    assert dt_utc is not None
+    assert (dt_utc.day, dt_utc.hour, dt_utc.minute) == (1, 9, 5)
+    assert dt_msk.hour == 12
+
+    assert parse_liquipedia_time("Smarch 1, 2026 - 09:05UTC", target_tz) == (None, None)
+    assert parse_liquipedia_time("February 30, 2026 - 09:05UTC", target_tz) == (None, None)
+    assert parse_liquipedia_time("March 1, 2026 - 09:05XYZ", target_tz) == (None, None)
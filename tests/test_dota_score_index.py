@@ -0,0 +1,20 @@
+from cybermatches.parsers.dota import _build_score_index
+
+
+HTML = b"""<html><body>
+<div class="match-info" data-match-id="ID_OnlyInMarkup_R01-M002">
+  <div class="match-info-header-scoreholder-scorewrapper">
+    <span class="match-info-header-scoreholder-upper">2:0</span>
+    <span class="match-info-header-scoreholder-lower">(Bo3)</span>
+  </div>
+  <div class="match-page-button"><a href="/dota2/Match:ID_FromLink_R01-M001">Details</a></div>
+</div>
+</body></html>"""
+
+
+def test_score_index_keeps_ids_outside_links():
+    index = _build_score_index(HTML)
+    assert "ID_FromLink_R01-M001" in index
+    # ID только в разметке контейнера (не в <a>) тоже индексируется
+    assert "ID_OnlyInMarkup_R01-M002" in index
+    assert index["ID_OnlyInMarkup_R01-M002"] == index["ID_FromLink_R01-M001"]
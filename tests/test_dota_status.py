@@ -0,0 +1,58 @@
+from datetime import datetime, timedelta
+
+try:
+    from zoneinfo import ZoneInfo
+except ImportError:  # pragma: no cover
+    from backports.zoneinfo import ZoneInfo
+
+from cybermatches.parsers.dota import _initial_status, _status_from_text
+
+
+NOW = datetime(2026, 1, 10, 18, 0, tzinfo=ZoneInfo("Europe/Moscow"))
+
+
+def _row(minutes_from_now, score=None, bo=None, status=None):
+    return {
+        "match_time_msk": NOW + timedelta(minutes=minutes_from_now),
+        "score": score,
+        "bo": bo,
+        "status": status,
+    }
+
+
+def test_initial_status_branches_match_refresh_statuses_case():
+    # 1) финальный счёт относительно bo
+    assert _initial_status(_row(-60, "2:1", 3, "live"), NOW) == "finished"
+    # 1б) старше 24 часов и есть счёт
+    assert _initial_status(_row(-25 * 60, "1:1", None, "live"), NOW) == "finished"
+    # 2) ещё не начался
+    assert _initial_status(_row(30, None, 3, None), NOW) == "upcoming"
+    # 3) должен идти
+    assert _initial_status(_row(-60, "1:0", 3, "upcoming"), NOW) == "live"
+    # 4) слишком старый live без финального счёта
+    assert _initial_status(_row(-13 * 60, None, 3, "live"), NOW) == "unknown"
+    # иначе не трогаем
+    assert _initial_status(_row(-6 * 60, None, 3, "live"), NOW) == "live"
+    assert _initial_status({"match_time_msk": None, "score": "2:0", "bo": 3, "status": "x"}, NOW) == "x"
+
+
+def test_initial_status_score_format_follows_sql_regex():
+    # SQL принимает только '^[0-9]+:[0-9]+$'
+    assert _initial_status(_row(-60, "2-1", 3, "upcoming"), NOW) == "live"
+    assert _initial_status(_row(-60, " 2 : 1 ", 3, "upcoming"), NOW) == "live"
+    # верхней границы в SQL нет
+    assert _initial_status(_row(-60, "11:0", 21, "live"), NOW) == "finished"
+    # bo = 0 в SQL не пропускается: (0 / 2)::int + 1 = 1
+    assert _initial_status(_row(-60, "1:0", 0, "live"), NOW) == "finished"
+    assert _initial_status(_row(-60, "0:0", 0, "live"), NOW) == "live"
+
+
+def test_status_from_text_keeps_keyword_priority():
+    assert _status_from_text("Live") == "live"
+    assert _status_from_text("Scheduled") == "upcoming"
+    assert _status_from_text("Completed") == "finished"
+    assert _status_from_text("Postponed") is None
+    # live важнее, даже если стоит в тексте позже
+    assert _status_from_text("finished (was live)") == "live"
+    assert _status_from_text("scheduled, live soon") == "live"
+    assert _status_from_text("completed upcoming") == "upcoming"
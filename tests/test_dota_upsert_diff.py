@@ -0,0 +1,66 @@
+from datetime import datetime
+
+import pytest
+
+from cybermatches.parsers.dota import _UPSERT_DIFF_COLUMNS, _upsert_changes_row
+
+
+EXISTING_ROW = {
+    "match_time_msk": datetime(2026, 1, 10, 18, 0),
+    "match_time_raw": "January 10, 2026 - 18:00 MSK",
+    "team1": "Team Spirit",
+    "team2": "Team Liquid",
+    "score": "1:0",
+    "bo": 3,
+    "tournament": "DreamLeague",
+    "status": "live",
+    "match_url": "https://liquipedia.net/dota2/Match:ID_abc_R01-M001",
+}
+
+NEW_VALUES = {
+    "match_time_msk": datetime(2026, 1, 10, 19, 0),
+    "match_time_raw": "January 10, 2026 - 19:00 MSK",
+    "team1": "Gaimin Gladiators",
+    "team2": "Tundra Esports",
+    "score": "2:0",
+    "bo": 5,
+    "tournament": "PGL Wallachia",
+    "status": "finished",
+    "match_url": "https://liquipedia.net/dota2/Match:ID_abc_R01-M002",
+}
+
+
+def _existing():
+    return tuple(EXISTING_ROW[col] for col in _UPSERT_DIFF_COLUMNS)
+
+
+def test_same_row_does_not_change():
+    assert _upsert_changes_row(dict(EXISTING_ROW), _existing()) is False
+
+
+@pytest.mark.parametrize("col", _UPSERT_DIFF_COLUMNS)
+def test_null_keeps_old_value(col):
+    # COALESCE(s.col, d.col): NULL из парсера старое значение не трогает
+    row = dict(EXISTING_ROW, **{col: None})
+    assert _upsert_changes_row(row, _existing()) is False
+
+
+@pytest.mark.parametrize("col", _UPSERT_DIFF_COLUMNS)
+def test_real_change_is_detected(col):
+    row = dict(EXISTING_ROW, **{col: NEW_VALUES[col]})
+    assert _upsert_changes_row(row, _existing()) is True
+
+
+@pytest.mark.parametrize("col", _UPSERT_DIFF_COLUMNS)
+def test_new_value_over_null_is_detected(col):
+    # s.col IS DISTINCT FROM d.col, когда в БД NULL
+    existing = tuple(None if c == col else EXISTING_ROW[c] for c in _UPSERT_DIFF_COLUMNS)
+    assert _upsert_changes_row(dict(EXISTING_ROW), existing) is True
+
+
+def test_unknown_status_keeps_old_status():
+    row = dict(EXISTING_ROW, status="unknown")
+    assert _upsert_changes_row(row, _existing()) is False
+    # даже если в БД статуса нет
+    existing = tuple(None if c == "status" else EXISTING_ROW[c] for c in _UPSERT_DIFF_COLUMNS)
+    assert _upsert_changes_row(row, existing) is False